@@ -0,0 +1,68 @@
+"""
+Адаптивное декодирование Whisper
+Сначала жадно (beam_size=1); beam search только если жадный результат неуверенный
+"""
+
+import time
+
+
+class AdaptiveDecoder:
+    """
+    Уверенность оцениваем по сегментам faster-whisper:
+      avg_logprob ниже min_avg_logprob или compression_ratio выше max_compression_ratio
+      => перерасшифровываем с beam_size.
+    """
+
+    def __init__(
+        self,
+        beam_size: int = 5,
+        min_avg_logprob: float = -0.5,
+        max_compression_ratio: float = 2.4,
+    ):
+        self.beam_size = beam_size
+        self.min_avg_logprob = min_avg_logprob
+        self.max_compression_ratio = max_compression_ratio
+
+        self.greedy_calls = 0
+        self.greedy_time = 0.0
+        self.fallback_calls = 0
+        self.fallback_time = 0.0
+
+    def is_confident(self, segments) -> bool:
+        for seg in segments:
+            if seg.avg_logprob < self.min_avg_logprob:
+                return False
+            if seg.compression_ratio > self.max_compression_ratio:
+                return False
+        return True
+
+    def transcribe(self, model, samples, **kwargs) -> str:
+        t0 = time.perf_counter()
+
+        # temperature=0 — отключаем встроенный температурный fallback, решаем сами
+        greedy_kwargs = dict(kwargs, beam_size=1, temperature=0.0)
+        segments = list(model.transcribe(samples, **greedy_kwargs)[0])
+
+        if self.is_confident(segments):
+            self.greedy_calls += 1
+            self.greedy_time += time.perf_counter() - t0
+            return " ".join(seg.text for seg in segments)
+
+        beam_kwargs = dict(kwargs, beam_size=self.beam_size)
+        segments = list(model.transcribe(samples, **beam_kwargs)[0])
+
+        # время fallback включает и неудачную жадную попытку — это честная цена
+        self.fallback_calls += 1
+        self.fallback_time += time.perf_counter() - t0
+        return " ".join(seg.text for seg in segments)
+
+    def report(self) -> str:
+        total = self.greedy_calls + self.fallback_calls
+        rate = self.fallback_calls / total if total else 0.0
+        greedy_avg = self.greedy_time / self.greedy_calls * 1000 if self.greedy_calls else 0.0
+        fallback_avg = self.fallback_time / self.fallback_calls * 1000 if self.fallback_calls else 0.0
+        return (
+            f"ASR: жадно {self.greedy_calls} (в среднем {greedy_avg:.0f} мс), "
+            f"beam {self.fallback_calls} (в среднем {fallback_avg:.0f} мс), "
+            f"fallback {rate:.0%}"
+        )
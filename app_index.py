@@ -0,0 +1,160 @@
+"""
+Индекс имён приложений для launch_app / find_app_path
+Ключи из SYSTEM_APPS, COMMON_APPS, APP_NAME_ALIASES и apps.json хранятся
+в "сложенном" виде (кириллица -> латиница + упрощение написания) и по триграммам,
+так что "дискорд", "discord" и "дискорт" попадают в одно приложение.
+"""
+
+import sys
+import time
+
+# кириллица -> латиница
+_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+# упрощение латиницы, чтобы английское и транслитерированное написание сходились
+_LATIN_FOLD = [("ch", "\x01"), ("ph", "f"), ("ck", "k"), ("c", "k"), ("\x01", "ch"),
+               ("w", "v"), ("x", "ks"), ("q", "k"), ("y", "i"), ("ee", "i")]
+
+# ниже — уже другое приложение: "вордпад" ~ "word" 0.62, "хромиум" ~ "chrome" 0.67,
+# а опечатки "дискорт", "телеграмм" — от 0.8
+MIN_FUZZY_SCORE = 0.75
+
+
+def fold(text: str) -> str:
+    t = " ".join(text.lower().split())
+    t = "".join(_TRANSLIT.get(ch, ch) for ch in t)
+    for a, b in _LATIN_FOLD:
+        t = t.replace(a, b)
+    return t
+
+
+def trigrams(text: str) -> set[str]:
+    t = f"  {text} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+class AppIndex:
+    def __init__(self):
+        # сложенный ключ -> (приоритет источника, исходный ключ, каноническое имя)
+        self._exact: dict[str, tuple[int, str, str]] = {}
+        self._grams: dict[str, dict[str, set[str]]] = {}
+        self._gram_index: dict[str, set[str]] = {}
+
+    # приоритеты: пользовательские записи важнее встроенных
+    SOURCES = {"apps.json": 0, "alias": 1, "system": 2, "common": 3}
+
+    def add(self, key: str, canonical: str, source: str):
+        """Добавить (или обновить) ключ — используется и при сборке, и из register_app()"""
+        key = key.strip().lower()
+        folded = fold(key)
+        if not folded:
+            return
+        prio = self.SOURCES.get(source, 9)
+        old = self._exact.get(folded)
+        if old is not None and old[0] < prio:
+            return
+        self._exact[folded] = (prio, key, canonical.strip().lower())
+
+        if folded not in self._grams:
+            grams = trigrams(folded)
+            self._grams[folded] = grams
+            for g in grams:
+                self._gram_index.setdefault(g, set()).add(folded)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def _fuzzy(self, folded: str) -> tuple[float, str] | None:
+        grams = trigrams(folded)
+        counts: dict[str, int] = {}
+        for g in grams:
+            for key in self._gram_index.get(g, ()):
+                counts[key] = counts.get(key, 0) + 1
+
+        best = None
+        for key, common in counts.items():
+            score = 2 * common / (len(grams) + len(self._grams[key]))
+            cand = (score, len(key), key)
+            if best is None or cand > best:
+                best = cand
+        if best is None or best[0] < MIN_FUZZY_SCORE:
+            return None
+        return best[0], best[2]
+
+    def resolve_scored(self, name: str, fuzzy: bool = True) -> tuple[str, float] | None:
+        """(каноническое имя, уверенность 0..1) или None; fuzzy=False — только точные совпадения слов"""
+        folded = fold(name)
+        if not folded:
+            return None
+
+        hit = self._exact.get(folded)
+        if hit is not None:
+            return hit[2], 1.0
+
+        # самый длинный ключ, совпавший с отрезком фразы целыми словами:
+        # "опера gx пожалуйста" -> "опера gx", а не "опера"
+        words = folded.split()
+        best_span = None
+        for i in range(len(words)):
+            for j in range(len(words), i, -1):
+                span = " ".join(words[i:j])
+                hit = self._exact.get(span)
+                if hit is not None:
+                    cand = (len(span), -hit[0], hit[2])
+                    if best_span is None or cand > best_span:
+                        best_span = cand
+                    break
+        if best_span is not None:
+            return best_span[2], 0.9
+        if not fuzzy:
+            return None
+
+        # нечёткий поиск: по всей строке и по отдельным словам
+        best = None
+        for part in [folded] + (words if len(words) > 1 else []):
+            found = self._fuzzy(part)
+            if found and (best is None or found > best):
+                best = found
+        if best is None:
+            return None
+        score, key = best
+        return self._exact[key][2], round(score * 0.8, 3)
+
+    def resolve(self, name: str, fuzzy: bool = True) -> str | None:
+        found = self.resolve_scored(name, fuzzy)
+        return found[0] if found else None
+
+
+def build_index(system_apps: dict, common_apps: dict, aliases: dict, registered: dict) -> AppIndex:
+    index = AppIndex()
+    for key in system_apps:
+        index.add(key, key, "system")
+    for key in common_apps:
+        index.add(key, key, "common")
+    for wrong, canonical in aliases.items():
+        index.add(wrong, canonical, "alias")
+        index.add(canonical, canonical, "alias")
+    for key in registered:
+        index.add(key, key, "apps.json")
+    return index
+
+
+if __name__ == "__main__":
+    import words_config
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    index = build_index({}, {}, words_config.APP_NAME_ALIASES, {})
+    queries = sys.argv[1:] or ["дискорд", "discord", "дискорт", "опера gx", "опера", "телеграмм", "стимчик",
+                               "вордпад", "хромиум"]
+    for q in queries:
+        t0 = time.perf_counter()
+        found = index.resolve_scored(q)
+        print(f"{q!r:<16} -> {found}  ({(time.perf_counter() - t0) * 1e6:.0f} мкс)")
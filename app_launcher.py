@@ -9,6 +9,10 @@ import subprocess
 from pathlib import Path
 import winreg
 
+import words_config
+from app_index import build_index
+from config_service import read_json, service
+
 # Путь к конфигу приложений
 CONFIG_PATH = Path(__file__).parent / "apps.json"
 
@@ -90,20 +94,45 @@ COMMON_APPS = {
     ],
 }
 
+# apps.json держим в памяти; перечитывается только при изменении файла
+_apps_file = service.watch("apps", CONFIG_PATH, read_json)
+
 def load_config() -> dict:
     """Загрузка сохранённых путей к приложениям"""
-    if CONFIG_PATH.is_file():
-        try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    return dict(_apps_file.get())
 
 def save_config(config: dict):
     """Сохранение путей к приложениям"""
     with open(CONFIG_PATH, "w", encoding="utf-8") as f:
         json.dump(config, f, ensure_ascii=False, indent=2)
+    _apps_file.replace(dict(config))
+
+# Индекс имён строится один раз, дополняется в register_app()
+# и пересобирается целиком при изменении apps.json или words_config.py
+_app_index = None
+_aliases = words_config.APP_NAME_ALIASES
+
+def get_app_index():
+    global _app_index
+    if _app_index is None:
+        _app_index = build_index(SYSTEM_APPS, COMMON_APPS, _aliases, load_config())
+    return _app_index
+
+def rebuild_app_index(aliases: dict | None = None, registered: dict | None = None):
+    """Собирает новый индекс и подменяет старый одной операцией"""
+    global _app_index, _aliases
+    if aliases is not None:
+        _aliases = aliases
+    if registered is None:
+        registered = load_config()
+    _app_index = build_index(SYSTEM_APPS, COMMON_APPS, _aliases, registered)
+
+_apps_file.listeners.append(lambda registered: rebuild_app_index(registered=registered))
+
+def resolve_app_name(name: str, fuzzy: bool = True) -> str:
+    """Каноническое имя приложения ('дискорд' -> 'discord') или само имя, если не узнали"""
+    name = name.strip().lower()
+    return get_app_index().resolve(name, fuzzy) or name
 
 def find_app_in_registry(app_name: str) -> str | None:
     """Поиск приложения в реестре Windows"""
@@ -127,39 +156,43 @@ def find_app_in_registry(app_name: str) -> str | None:
 def find_app_path(app_name: str) -> str | None:
     """Умный поиск пути к приложению"""
     app_name = app_name.lower().strip()
+    # без нечёткого поиска: "вордпад" не должен открыть word
+    canonical = resolve_app_name(app_name, fuzzy=False)
 
     # 1. Системные приложения
-    if app_name in SYSTEM_APPS:
-        return SYSTEM_APPS[app_name]
+    if canonical in SYSTEM_APPS:
+        return SYSTEM_APPS[canonical]
 
     # 2. Сохранённая конфигурация
     config = load_config()
-    if app_name in config:
-        path = config[app_name]
-        if os.path.isfile(path):
-            return path
+    for key in (app_name, canonical):
+        if key in config and os.path.isfile(config[key]):
+            return config[key]
 
     # 3. Популярные приложения
     username = os.environ.get("USERNAME", "Administrator")
 
-    for key, paths in COMMON_APPS.items():
-        if app_name in key or key in app_name:
-            for path_template in paths:
-                path = path_template.replace("{username}", username)
+    if canonical in COMMON_APPS:
+        for path_template in COMMON_APPS[canonical]:
+            path = path_template.replace("{username}", username)
 
-                # Поддержка wildcards
-                if "*" in path:
-                    from glob import glob
-                    matches = glob(path)
-                    if matches:
-                        return matches[0]
-                elif os.path.isfile(path):
-                    return path
+            # Поддержка wildcards
+            if "*" in path:
+                from glob import glob
+                matches = glob(path)
+                if matches:
+                    return matches[0]
+            elif os.path.isfile(path):
+                return path
+
+    # 4-5 ищут по подстроке — сначала имя, как его назвали, потом каноническое ("дискорд" -> "discord")
+    names = [app_name] + ([canonical] if canonical != app_name else [])
 
     # 4. Реестр
-    registry_path = find_app_in_registry(app_name)
-    if registry_path:
-        return registry_path
+    for name in names:
+        registry_path = find_app_in_registry(name)
+        if registry_path:
+            return registry_path
 
     # 5. Поиск по стандартным путям
     search_paths = [
@@ -177,10 +210,11 @@ def find_app_path(app_name: str) -> str | None:
                 if not item.is_dir():
                     continue
 
-                if app_name in item.name.lower():
-                    for exe_file in item.rglob("*.exe"):
-                        if app_name in exe_file.stem.lower():
-                            return str(exe_file)
+                for name in names:
+                    if name in item.name.lower():
+                        for exe_file in item.rglob("*.exe"):
+                            if name in exe_file.stem.lower():
+                                return str(exe_file)
         except PermissionError:
             continue
 
@@ -192,17 +226,23 @@ def register_app(name: str, path: str):
     config = load_config()
     config[name] = path
     save_config(config)
+    get_app_index().add(name, name, "apps.json")
+
+def ask_console(question: str) -> str | None:
+    return input(f"{question} ").strip('" ').strip() or None
 
-def launch_app(app_name: str, args: list = None) -> bool:
+def launch_app(app_name: str, args: list = None, ask=ask_console) -> bool:
     """
     Запуск приложения по имени
+    ask(вопрос) -> ответ или None — как спросить путь, если приложение не нашлось
+    (по умолчанию input(); в main — вопрос голосом без остановки микрофона)
     """
     app_path = find_app_path(app_name)
 
     if not app_path:
         print(f"❌ Юко: не нашла приложение '{app_name}'")
         print("💡 Подсказка: перетащи сюда .exe файл программы")
-        user_input = input("Путь к программе (или Enter для отмены): ").strip('" ').strip()
+        user_input = ask("Путь к программе (или Enter для отмены):")
 
         if user_input and os.path.isfile(user_input):
             register_app(app_name, user_input)
@@ -243,7 +283,7 @@ def open_app(app_name: str):
     """Алиас для launch_app"""
     return launch_app(app_name)
 
-__all__ = ["launch_app", "list_registered_apps", "register_app", "find_app_path"]
+__all__ = ["launch_app", "list_registered_apps", "register_app", "find_app_path", "resolve_app_name"]
 
 if __name__ == "__main__":
     print("🧪 Тест модуля app_launcher")
@@ -0,0 +1,302 @@
+"""
+Профили распознавания речи (Whisper) и автоподбор профиля под машину
+Профиль выбирается через YUKO_ASR_PROFILE или берётся из результатов --tune-asr
+"""
+
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+DATA_DIR = BASE_DIR / "yuko_data"
+TUNED_PROFILE_PATH = DATA_DIR / "asr_profile.json"
+CLIPS_DIR = BASE_DIR / "tune_clips"
+REFERENCES_PATH = CLIPS_DIR / "references.json"
+
+SAMPLE_RATE = 16000
+
+# Готовые профили. cpu_threads=0 — столько потоков, сколько решит CTranslate2.
+# adaptive=True — сначала жадно, beam_size только при низкой уверенности (см. adaptive_asr)
+PROFILES = {
+    "latency": {
+        "model": "base",
+        "device": "cpu",
+        "compute_type": "int8",
+        "cpu_threads": 0,
+        "num_workers": 1,
+        "beam_size": 1,
+        "min_silence_duration_ms": 300,
+    },
+    "balanced": {
+        "model": "small",
+        "device": "cpu",
+        "compute_type": "int8",
+        "cpu_threads": 0,
+        "num_workers": 1,
+        "beam_size": 5,
+        "min_silence_duration_ms": 500,
+        "adaptive": True,
+        "min_avg_logprob": -0.5,
+        "max_compression_ratio": 2.4,
+    },
+    "accuracy": {
+        "model": "medium",
+        "device": "cpu",
+        "compute_type": "int8",
+        "cpu_threads": 0,
+        "num_workers": 1,
+        "beam_size": 5,
+        "min_silence_duration_ms": 500,
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def host_id() -> str:
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def load_profile() -> dict:
+    """
+    Порядок выбора:
+      1) YUKO_ASR_PROFILE=latency|balanced|accuracy|tuned
+      2) подобранный --tune-asr профиль для этой машины
+      3) balanced
+    """
+    name = os.environ.get("YUKO_ASR_PROFILE", "").strip().lower()
+    if name in PROFILES:
+        profile = dict(PROFILES[name], name=name)
+    else:
+        profile = load_tuned_profile()
+        if not profile or name not in ("tuned", ""):
+            if name and name != "tuned":
+                print(f"Юко: неизвестный профиль ASR '{name}', беру {DEFAULT_PROFILE}.")
+            profile = dict(PROFILES[DEFAULT_PROFILE], name=DEFAULT_PROFILE)
+
+    # YUKO_ADAPTIVE_DECODING=0/1 и YUKO_MIN_LOGPROB переопределяют профиль
+    adaptive = os.environ.get("YUKO_ADAPTIVE_DECODING", "").strip().lower()
+    if adaptive:
+        profile["adaptive"] = adaptive in ("1", "true", "yes")
+    min_logprob = os.environ.get("YUKO_MIN_LOGPROB", "").strip()
+    if min_logprob:
+        profile["min_avg_logprob"] = float(min_logprob)
+    return profile
+
+
+def load_tuned_profile() -> dict | None:
+    if not TUNED_PROFILE_PATH.is_file():
+        return None
+    try:
+        with open(TUNED_PROFILE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if data.get("host") != host_id():
+        return None
+    return dict(data["profile"], name="tuned")
+
+
+def model_kwargs(profile: dict) -> dict:
+    """Аргументы для WhisperModel(...)"""
+    return dict(
+        model_size_or_path=profile["model"],
+        device=profile["device"],
+        compute_type=profile["compute_type"],
+        cpu_threads=profile["cpu_threads"],
+        num_workers=profile["num_workers"],
+    )
+
+
+def make_decoder(profile: dict):
+    """AdaptiveDecoder для профиля или None, если адаптивный режим выключен"""
+    if not profile.get("adaptive") or profile["beam_size"] <= 1:
+        return None
+    from adaptive_asr import AdaptiveDecoder
+    return AdaptiveDecoder(
+        beam_size=profile["beam_size"],
+        min_avg_logprob=profile.get("min_avg_logprob", -0.5),
+        max_compression_ratio=profile.get("max_compression_ratio", 2.4),
+    )
+
+
+def transcribe_kwargs(profile: dict) -> dict:
+    """Аргументы для model.transcribe(...)"""
+    return dict(
+        language="ru",
+        beam_size=profile["beam_size"],
+        vad_filter=True,
+        vad_parameters=dict(
+            min_silence_duration_ms=profile["min_silence_duration_ms"],
+        ),
+    )
+
+
+# ---------- оценка качества ----------
+
+def normalize_text(text: str) -> list[str]:
+    text = text.lower().replace("ё", "е")
+    return re.findall(r"\w+", text)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+# ---------- автоподбор ----------
+
+def load_references() -> dict:
+    if not REFERENCES_PATH.is_file():
+        return {}
+    with open(REFERENCES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_clips() -> list[tuple[str, object, str]]:
+    """[(имя файла, сэмплы float32 16 кГц, эталонный текст)] для записанных клипов"""
+    from faster_whisper import decode_audio
+
+    clips = []
+    missing = []
+    for name, reference in load_references().items():
+        path = CLIPS_DIR / name
+        if not path.is_file():
+            missing.append(name)
+            continue
+        clips.append((name, decode_audio(str(path), sampling_rate=SAMPLE_RATE), reference))
+
+    if missing:
+        print(f"Юко: нет {len(missing)} клипов в {CLIPS_DIR.name}/ — запиши их: python asr_profiles.py --record")
+    return clips
+
+
+def candidate_profiles(models=("tiny", "base", "small"), beams=(1, 5)) -> list[dict]:
+    cores = os.cpu_count() or 4
+    threads = sorted({max(1, cores // 2), cores})
+    candidates = []
+    for model, beam, cpu_threads in itertools.product(models, beams, threads):
+        candidates.append({
+            "model": model,
+            "device": "cpu",
+            "compute_type": "int8",
+            "cpu_threads": cpu_threads,
+            "num_workers": 1,
+            "beam_size": beam,
+            "min_silence_duration_ms": 500,
+        })
+    return candidates
+
+
+def benchmark_profile(profile: dict, clips) -> dict:
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(**model_kwargs(profile))
+    kwargs = transcribe_kwargs(profile)
+
+    # прогрев, чтобы не мерить ленивую инициализацию
+    list(model.transcribe(clips[0][1], **kwargs)[0])
+
+    audio_s = 0.0
+    decode_s = 0.0
+    errors = 0.0
+    for _, samples, reference in clips:
+        t0 = time.perf_counter()
+        segments, _ = model.transcribe(samples, **kwargs)
+        text = " ".join(seg.text for seg in segments)
+        decode_s += time.perf_counter() - t0
+        audio_s += len(samples) / SAMPLE_RATE
+        errors += word_error_rate(reference, text)
+
+    return {
+        "rtf": decode_s / audio_s,
+        "latency_ms": decode_s / len(clips) * 1000,
+        "wer": errors / len(clips),
+    }
+
+
+def tune(max_wer: float = 0.15) -> dict | None:
+    """Перебирает профили на клипах и сохраняет самый быстрый с WER <= max_wer"""
+    clips = load_clips()
+    if not clips:
+        print("Юко: нечего мерить — клипы не найдены.")
+        return None
+
+    print(f"Юко: подбираю профиль ASR на {len(clips)} клипах (порог WER {max_wer:.0%})")
+    best = None
+    for profile in candidate_profiles():
+        label = f"{profile['model']:<6} beam={profile['beam_size']} threads={profile['cpu_threads']}"
+        try:
+            metrics = benchmark_profile(profile, clips)
+        except Exception as e:
+            print(f"  {label}: ошибка {e}")
+            continue
+
+        ok = metrics["wer"] <= max_wer
+        print(
+            f"  {label}: RTF {metrics['rtf']:.2f}, {metrics['latency_ms']:.0f} мс, "
+            f"WER {metrics['wer']:.1%} {'✅' if ok else '❌'}"
+        )
+        if ok and (best is None or metrics["latency_ms"] < best[1]["latency_ms"]):
+            best = (profile, metrics)
+
+    if best is None:
+        print("Юко: ни один профиль не прошёл порог точности, оставляю как было.")
+        return None
+
+    profile, metrics = best
+    DATA_DIR.mkdir(exist_ok=True)
+    with open(TUNED_PROFILE_PATH, "w", encoding="utf-8") as f:
+        json.dump(
+            {"host": host_id(), "profile": profile, "metrics": metrics, "max_wer": max_wer},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"✅ Юко: сохранила профиль {profile['model']} beam={profile['beam_size']} в {TUNED_PROFILE_PATH}")
+    return profile
+
+
+def record_clips(seconds: float = 3.0):
+    """Записывает с микрофона недостающие клипы по списку эталонных фраз"""
+    import wave
+
+    import numpy as np
+    import sounddevice as sd
+
+    CLIPS_DIR.mkdir(exist_ok=True)
+    for name, reference in load_references().items():
+        path = CLIPS_DIR / name
+        if path.is_file():
+            continue
+        input(f"Скажи: «{reference}» — Enter и говори...")
+        audio = sd.rec(int(seconds * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1, dtype="int16")
+        sd.wait()
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(np.ascontiguousarray(audio).tobytes())
+        print(f"✅ {name}")
+
+
+if __name__ == "__main__":
+    if "--record" in sys.argv:
+        record_clips()
+    else:
+        tune()
@@ -0,0 +1,226 @@
+"""
+Непрерывный захват звука с микрофона для Юко
+Кольцевой буфер + определение конца фразы (endpointing)
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SIZE = SAMPLE_RATE * FRAME_MS // 1000
+
+
+class RingBuffer:
+    """Кольцевой буфер float32 с абсолютной нумерацией сэмплов"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.total = 0  # сколько сэмплов записано за всё время
+        self.lock = threading.Lock()
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            with self.lock:
+                self.data[:] = samples
+                self.total += n
+            return
+
+        with self.lock:
+            pos = self.total % self.capacity
+            first = min(n, self.capacity - pos)
+            self.data[pos:pos + first] = samples[:first]
+            if first < n:
+                self.data[:n - first] = samples[first:]
+            self.total += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Копия сэмплов [start, end) по абсолютным индексам"""
+        with self.lock:
+            start = max(start, self.total - self.capacity, 0)
+            end = min(end, self.total)
+            if end <= start:
+                return np.zeros(0, dtype=np.float32)
+            a = start % self.capacity
+            b = end % self.capacity
+            if a < b:
+                return self.data[a:b].copy()
+            return np.concatenate((self.data[a:], self.data[:b]))
+
+
+class AudioCapture:
+    """
+    Пишет микрофон в кольцевой буфер через sd.InputStream и режет поток на фразы.
+    Готовые фразы складываются в очередь, запись при этом не останавливается.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.01,
+        start_ms: int = 90,
+        end_silence_ms: int = 600,
+        min_speech_ms: int = 250,
+        max_utterance_s: float = 15.0,
+        preroll_ms: int = 300,
+        tail_ms: int = 200,
+        buffer_s: float = 30.0,
+        device=None,
+        gate=None,
+    ):
+        self.threshold = threshold
+        self.gate = gate  # SpeechGate из vad_gate; без него — фиксированный порог
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.end_frames = max(1, end_silence_ms // FRAME_MS)
+        self.min_speech = SAMPLE_RATE * min_speech_ms // 1000
+        self.max_utterance = int(SAMPLE_RATE * max_utterance_s)
+        self.preroll = SAMPLE_RATE * preroll_ms // 1000
+        self.tail = SAMPLE_RATE * tail_ms // 1000
+        self.device = device
+
+        self.ring = RingBuffer(int(SAMPLE_RATE * buffer_s))
+        self.utterances: queue.Queue = queue.Queue()
+        self.overflows = 0
+        # (начало в сэмплах, время конца) последней выданной фразы
+        self.last_info: tuple[int, float] | None = None
+
+        self._stream = None
+        self._thread = None
+        self._new_audio = threading.Event()
+        self._stop = threading.Event()
+
+        # состояние сегментатора
+        self._cursor = 0
+        self._voiced_run = 0
+        self._silence_run = 0
+        self._speech_start: int | None = None
+        self._last_voiced_end = 0
+
+    # ---------- поток sounddevice ----------
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        self.ring.write(indata[:, 0])
+        self._new_audio.set()
+
+    def start(self):
+        if self._stream is not None:
+            return
+        self._stop.clear()
+        self._cursor = self.ring.total
+
+        import sounddevice as sd  # тяжёлый импорт — только когда реально открываем микрофон
+        stream = sd.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=1,
+            dtype="float32",
+            blocksize=FRAME_SIZE,
+            device=self.device,
+            callback=self._callback,
+        )
+        stream.start()
+        self._stream = stream
+        self._thread = threading.Thread(target=self._segment_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._new_audio.set()
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._stream is not None and self._stream.active
+
+    # ---------- сегментация ----------
+
+    def _speech_mask(self, chunk: np.ndarray) -> np.ndarray:
+        if self.gate is not None:
+            return self.gate.frame_mask(chunk)
+        frames = chunk.reshape(-1, FRAME_SIZE)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return rms > self.threshold
+
+    def _segment_loop(self):
+        while not self._stop.is_set():
+            self._new_audio.wait(timeout=0.5)
+            self._new_audio.clear()
+
+            # если отстали больше чем на буфер — перескакиваем вперёд
+            oldest = self.ring.total - self.ring.capacity
+            if self._cursor < oldest:
+                self._cursor = oldest
+                self._reset_segment()
+
+            n = (self.ring.total - self._cursor) // FRAME_SIZE
+            if n <= 0:
+                continue
+            chunk = self.ring.read(self._cursor, self._cursor + n * FRAME_SIZE)
+            for voiced in self._speech_mask(chunk):
+                self._cursor += FRAME_SIZE
+                self._process_frame(bool(voiced))
+
+    def _process_frame(self, voiced: bool):
+        frame_end = self._cursor
+
+        if self._speech_start is None:
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                start = frame_end - self._voiced_run * FRAME_SIZE - self.preroll
+                self._speech_start = max(start, 0)
+                self._last_voiced_end = frame_end
+                self._silence_run = 0
+            return
+
+        if voiced:
+            self._silence_run = 0
+            self._last_voiced_end = frame_end
+        else:
+            self._silence_run += 1
+
+        too_long = frame_end - self._speech_start >= self.max_utterance
+        if self._silence_run >= self.end_frames or too_long:
+            self._emit(min(self._last_voiced_end + self.tail, frame_end))
+
+    def _emit(self, end: int):
+        start = self._speech_start
+        self._reset_segment()
+        if end - start < self.min_speech:
+            return
+        samples = self.ring.read(start, end)
+        self.utterances.put((samples, time.monotonic(), start))
+
+    def _reset_segment(self):
+        self._speech_start = None
+        self._voiced_run = 0
+        self._silence_run = 0
+
+    # ---------- выдача фраз ----------
+
+    def next_utterance(self, timeout: float | None = None) -> np.ndarray | None:
+        """Ждёт следующую законченную фразу (float32, 16 кГц)"""
+        try:
+            samples, end_time, start = self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.last_info = (start, end_time)
+        return samples
+
+    def current_speech(self) -> tuple[int, np.ndarray] | None:
+        """Ещё не законченная фраза: (начало, сэмплы до текущего момента)"""
+        start = self._speech_start
+        if start is None:
+            return None
+        return start, self.ring.read(start, self._cursor)
@@ -140,6 +140,10 @@ GROQ_API_KEY=your_groq_api_key_here
 
 # Если нужна OpenAI вместо Groq:
 # OPENAI_API_KEY=your_openai_key_here
+
+# Свой OpenAI-совместимый сервер вместо Groq (ключ тогда не обязателен):
+# YUKO_LLM_BASE_URL=http://127.0.0.1:8080/v1
+# YUKO_LLM_MODEL=llama-3.3-70b-versatile
 """
     
     try:
@@ -0,0 +1,150 @@
+"""
+Пакетная расшифровка записанных сессий (без микрофона)
+Пример:
+    python batch_transcribe.py записи/ --workers 4 --out results.jsonl
+На каждый файл — строка JSONL: файл, текст, интент, приложение, время
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from asr_profiles import load_profile, make_decoder, model_kwargs, transcribe_kwargs
+from phrase_analysis import PhraseAnalyzer
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".ogg", ".flac", ".m4a"}
+SAMPLE_RATE = 16000
+
+# своя модель в каждом процессе-воркере
+_worker_model = None
+_worker_profile = None
+_worker_decoder = None
+_worker_phrases = None
+
+
+def collect_files(inputs: list[str]) -> list[Path]:
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(
+                p for p in sorted(path.rglob("*"))
+                if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS
+            )
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"Юко: пропускаю {item} — не найден", file=sys.stderr)
+    return files
+
+
+def _init_worker(profile: dict):
+    global _worker_model, _worker_profile, _worker_decoder, _worker_phrases
+    import words_config
+    from faster_whisper import WhisperModel
+
+    # результаты уходят в главный процесс через pickle; всё, что воркер печатает, — диагностика
+    sys.stdout = sys.stderr
+    _worker_profile = profile
+    _worker_phrases = PhraseAnalyzer(words_config)
+    _worker_model = WhisperModel(**model_kwargs(profile))
+    _worker_decoder = make_decoder(profile)
+
+
+def _transcribe_file(path: str) -> dict:
+    from faster_whisper import decode_audio
+
+    t0 = time.perf_counter()
+    samples = decode_audio(path, sampling_rate=SAMPLE_RATE)
+    kwargs = transcribe_kwargs(_worker_profile)
+    if _worker_decoder:
+        text = _worker_decoder.transcribe(_worker_model, samples, **kwargs)
+    else:
+        segments, _ = _worker_model.transcribe(samples, **kwargs)
+        text = " ".join(seg.text for seg in segments)
+    text = text.strip().lower()
+    asr_s = time.perf_counter() - t0
+
+    corrected, fixes = _worker_phrases.corrector.correct(text)
+    intent = _worker_phrases.analyze(corrected) if text else None
+    app = _worker_phrases.extract_app_name(corrected) if intent == "app" else None
+    return {
+        "file": path,
+        "text": text,
+        "corrected": corrected,
+        "fixes": fixes,
+        "intent": intent,
+        "app": app,
+        "audio_s": round(len(samples) / SAMPLE_RATE, 3),
+        "asr_s": round(asr_s, 3),
+        "pid": os.getpid(),
+    }
+
+
+def run(files: list[Path], workers: int, out) -> dict:
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers, len(files)))
+
+    # ядра делим между процессами, чтобы CTranslate2 не дрался за них
+    # stdout занят JSONL — предупреждения профиля туда не пишем
+    with contextlib.redirect_stdout(sys.stderr):
+        tuned = load_profile()
+    profile = dict(tuned, cpu_threads=max(1, cores // workers), num_workers=1)
+
+    t0 = time.perf_counter()
+    audio_total = 0.0
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profile,)) as pool:
+        futures = {pool.submit(_transcribe_file, str(f)): f for f in files}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                audio_total += result["audio_s"]
+            except Exception as e:
+                result = {"file": str(futures[future]), "error": str(e)}
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            done += 1
+
+    wall = time.perf_counter() - t0
+    return {"files": done, "workers": workers, "wall_s": wall, "audio_s": audio_total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная расшифровка аудиофайлов для Юко")
+    parser.add_argument("inputs", nargs="+", help="папки или аудиофайлы")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--out", help="куда писать JSONL (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+        sys.stderr.reconfigure(encoding="utf-8")
+
+    files = collect_files(args.inputs)
+    if not files:
+        print("Юко: аудиофайлы не найдены.", file=sys.stderr)
+        return
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        stats = run(files, args.workers, out)
+    finally:
+        if args.out:
+            out.close()
+
+    speed = stats["audio_s"] / stats["wall_s"] if stats["wall_s"] else 0.0
+    print(
+        f"Юко: {stats['files']} файлов, {stats['workers']} процессов, "
+        f"{stats['wall_s']:.1f} с, {speed:.1f}x реального времени",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Реестр команд Юко: обработчики тегов ([SEARCH_FILE:...], [OPEN_BROWSER_NAMED:...], ...)
+выполняются в небольшом пуле потоков, а не в потоке, который слушает микрофон.
+Уточняющие вопросы ("где лежит браузер?") не вызывают input(): вопрос встаёт в очередь,
+ответить можно голосом (следующей фразой) или набрать в консоли; по таймауту вопрос снимается.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CANCEL_WORDS = ("отмена", "отмени", "не надо", "нет", "стоп")
+
+
+class Prompt:
+    def __init__(self, question: str, timeout_s: float, validate=None):
+        self.question = question
+        self.timeout_s = timeout_s
+        self.validate = validate
+        self.answer = None
+        self.done = threading.Event()
+
+
+class PromptQueue:
+    """Вопросы от команд; отвечает главный цикл (голосом) или консоль"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: list[Prompt] = []
+        self._console = None
+
+    def ask(self, question: str, timeout_s: float = 30.0, validate=None) -> str | None:
+        """Вызывается из потока команды; блокирует только его. None — отмена или таймаут"""
+        prompt = Prompt(question, timeout_s, validate)
+        with self._lock:
+            self._queue.append(prompt)
+            first = len(self._queue) == 1
+        if first:
+            self._show(prompt)
+
+        answered = prompt.done.wait(timeout_s)
+        with self._lock:
+            if prompt in self._queue:
+                self._queue.remove(prompt)
+            following = self._queue[0] if self._queue else None
+        if not answered:
+            print("Юко: не дождалась ответа, отменяю.")
+        if following is not None and not following.done.is_set():
+            self._show(following)
+        return prompt.answer
+
+    @staticmethod
+    def _show(prompt: Prompt):
+        print(f"Юко: {prompt.question} (скажи или напиши ответ, «отмена» — отменить)")
+
+    def pending(self) -> Prompt | None:
+        with self._lock:
+            return self._queue[0] if self._queue else None
+
+    def answer(self, text: str) -> bool:
+        """
+        Ответ на самый старый вопрос. False — вопросов нет или фраза на ответ не похожа
+        (не отмена и не проходит validate): тогда это обычная команда, главный цикл её выполняет.
+        """
+        prompt = self.pending()
+        if prompt is None:
+            return False
+        text = text.strip().strip('"').strip()
+        if not text:
+            return False
+        if text.lower().strip(" .!") in CANCEL_WORDS:
+            prompt.answer = None
+        elif prompt.validate is not None and not prompt.validate(text):
+            return False
+        else:
+            prompt.answer = text
+        prompt.done.set()
+        return True
+
+    def cancel_all(self):
+        with self._lock:
+            queue, self._queue = self._queue, []
+        for prompt in queue:
+            prompt.done.set()
+
+    def start_console(self):
+        """Строки из консоли идут в ответ на вопрос (например, перетащенный .exe)"""
+        if self._console is not None:
+            return
+        self._console = threading.Thread(target=self._console_loop, daemon=True)
+        self._console.start()
+
+    def _console_loop(self):
+        for line in sys.stdin:
+            if self.answer(line) or not line.strip():
+                continue
+            if self.pending() is not None:
+                print("Юко: не поняла ответ, попробуй ещё раз.")
+            else:
+                print("Юко: сейчас я ни о чём не спрашиваю.")
+
+
+class CommandRegistry:
+    def __init__(self, workers: int = 2, max_pending: int = 8):
+        self.handlers: dict[str, callable] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yuko-cmd")
+        # ограничение очереди: не копим десятки команд, если какая-то повисла
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.stats: dict[str, list] = {}  # имя -> [вызовов, ошибок, суммарное время]
+        self.dropped = 0
+
+    def command(self, *names: str):
+        """Декоратор: @registry.command("open_file") def handler(param, context_phrase): ..."""
+        def decorator(fn):
+            for name in names:
+                self.handlers[name.lower()] = fn
+            return fn
+        return decorator
+
+    def dispatch(self, name: str, param: str = "", context_phrase: str = ""):
+        """Ставит команду в пул и сразу возвращается; Future или None"""
+        name = name.lower()
+        handler = self.handlers.get(name)
+        if handler is None:
+            return None
+        if not self._slots.acquire(blocking=False):
+            self.dropped += 1
+            print(f"Юко: слишком много команд сразу, {name} пропускаю.")
+            return None
+        try:
+            return self._executor.submit(self._run, name, handler, param.strip(), context_phrase)
+        except RuntimeError:
+            # пул уже остановлен (выходим)
+            self._slots.release()
+            return None
+
+    def _run(self, name: str, handler, param: str, context_phrase: str):
+        t0 = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            result = handler(param, context_phrase)
+            ok = True
+        except PermissionError:
+            print("Юко: в системные файлы я не лезу, это опасно.")
+        except FileNotFoundError:
+            print("Юко: файл или папка не найдены.")
+        except Exception as e:
+            print(f"Юко: ошибка при выполнении команды {name}: {e}")
+        finally:
+            self._slots.release()
+
+        took = time.perf_counter() - t0
+        with self._lock:
+            st = self.stats.setdefault(name, [0, 0, 0.0])
+            st[0] += 1
+            st[1] += not ok
+            st[2] += took
+        status = "ок" if ok else "ошибка"
+        if result not in (None, True):
+            status += f", {result}"
+        print(f"⏱  {name}: {status}, {took * 1000:.0f} мс")
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def report(self) -> str:
+        if not self.stats:
+            return "Команды: не выполнялись"
+        parts = [
+            f"{name} {calls}× ~{total / calls * 1000:.0f} мс" + (f" (ошибок {errors})" if errors else "")
+            for name, (calls, errors, total) in sorted(self.stats.items())
+        ]
+        dropped = f", пропущено {self.dropped}" if self.dropped else ""
+        return "Команды: " + ", ".join(parts) + dropped
@@ -0,0 +1,149 @@
+"""
+Конфиги Юко в памяти с горячей перезагрузкой
+words_config.py, apps.json и browsers.json читаются один раз и перечитываются,
+только когда у файла поменялся mtime. Производные индексы (автомат ключевых слов,
+корректор, индекс приложений) пересобираются в фоновом потоке и подменяются целиком.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def read_json(path: Path) -> dict:
+    """{} — только если файла нет; битый (или недописанный) JSON — исключение,
+    чтобы WatchedFile.reload() остался на старой версии, а не затёр сохранённые пути пустым конфигом"""
+    if not path.is_file():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_module(path: Path):
+    """Свежая копия модуля-конфига (sys.modules не трогаем, старая копия живёт, пока нужна)"""
+    spec = importlib.util.spec_from_file_location(f"_reloaded_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _mtime(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class WatchedFile:
+    """Разобранный файл + его mtime; get() перечитывает только изменившийся файл"""
+
+    def __init__(self, path: Path, loader, initial=None):
+        self.path = Path(path)
+        self.loader = loader
+        self.listeners = []
+        # True — файл перечитывает фоновый поток ConfigService, get() ничего не ждёт
+        self.background = False
+        self._lock = threading.Lock()
+        if initial is not None:
+            self._value = initial
+            self._mtime = _mtime(self.path)
+        else:
+            self._mtime = _mtime(self.path)
+            try:
+                self._value = loader(self.path)
+            except Exception as e:
+                # битый уже при запуске — старой версии нет; начинаем с пустого, файл не трогаем
+                print(f"Юко: не смогла прочитать {self.path.name}: {e}")
+                self._value = {}
+
+    def changed(self) -> bool:
+        return _mtime(self.path) != self._mtime
+
+    def get(self):
+        if not self.background and self.changed():
+            self.reload()
+        return self._value
+
+    def replace(self, value):
+        """Вызывается после того, как мы сами записали файл: без перечитывания и пересборки"""
+        with self._lock:
+            self._value = value
+            self._mtime = _mtime(self.path)
+
+    def reload(self) -> bool:
+        with self._lock:
+            mtime = _mtime(self.path)
+            if mtime == self._mtime:
+                return False
+            try:
+                value = self.loader(self.path)
+            except Exception as e:
+                # битый файл: остаёмся на старой версии, пока его не поправят
+                print(f"Юко: не смогла перечитать {self.path.name}: {e}")
+                self._mtime = mtime
+                return False
+
+            # сначала пересобираем всё производное, потом разом подменяем
+            for listener in self.listeners:
+                try:
+                    listener(value)
+                except Exception as e:
+                    print(f"Юко: ошибка при обновлении после {self.path.name}: {e}")
+            self._value = value
+            self._mtime = mtime
+        print(f"🔄 Юко: перечитала {self.path.name}")
+        return True
+
+
+class ConfigService:
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.files: dict[str, WatchedFile] = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def watch(self, name: str, path: Path, loader=read_json, on_reload=None, initial=None) -> WatchedFile:
+        watched = self.files.get(name)
+        if watched is None:
+            watched = WatchedFile(path, loader, initial)
+            watched.background = self._thread is not None
+            self.files[name] = watched
+        if on_reload is not None:
+            watched.listeners.append(on_reload)
+        return watched
+
+    def get(self, name: str):
+        return self.files[name].get()
+
+    def check(self):
+        """Один дешёвый проход по mtime всех файлов"""
+        for watched in list(self.files.values()):
+            if watched.changed():
+                watched.reload()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        for watched in self.files.values():
+            watched.background = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for watched in self.files.values():
+            watched.background = False
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+# общий экземпляр на весь процесс
+service = ConfigService()
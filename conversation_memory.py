@@ -0,0 +1,174 @@
+"""
+Память разговора для LLM с жёстким бюджетом токенов
+Последние реплики уходят в запрос, пока влезают в бюджет; старые вытесняются первыми
+и (по желанию) сжимаются в короткую сводку. После долгой паузы разговор начинается заново.
+Так "а подробнее?" понимается, а размер запроса и задержка не растут за долгую сессию.
+
+    python conversation_memory.py   # прогон длинного диалога: токены в запросе по ходам
+"""
+
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Грубая оценка без токенизатора: латиница ~4 символа на токен, кириллица ~2.5,
+    каждый знак препинания — отдельный токен.
+    """
+    total = 0
+    for w in _WORD_RE.findall(text):
+        if not w[0].isalnum() and w[0] != "_":
+            total += 1
+        elif w.isascii():
+            total += math.ceil(len(w) / 4)
+        else:
+            total += math.ceil(len(w) / 2.5)
+    return total
+
+
+# служебные токены чата на каждое сообщение (роль, разделители)
+MESSAGE_OVERHEAD = 4
+
+
+class Turn:
+    __slots__ = ("role", "text", "tokens")
+
+    def __init__(self, role: str, text: str):
+        self.role = role
+        self.text = text
+        self.tokens = estimate_tokens(text) + MESSAGE_OVERHEAD
+
+
+class ConversationMemory:
+    def __init__(
+        self,
+        budget_tokens: int = 600,
+        idle_reset_s: float = 300.0,
+        summary_tokens: int = 120,
+        summarize: bool = True,
+    ):
+        self.budget_tokens = budget_tokens
+        self.idle_reset_s = idle_reset_s
+        # сводке — не больше половины бюджета, иначе дословным репликам не остаётся места
+        self.summary_tokens = max(0, min(summary_tokens, budget_tokens // 2))
+        self.summarize = summarize
+
+        self.turns: deque[Turn] = deque()
+        self.history_tokens = 0
+        self.summary: list[str] = []  # по строке на вытесненную реплику, от старых к новым
+        self.last_time = 0.0
+
+        self.prompt_tokens: list[int] = []
+        self.evicted = 0
+        self.resets = 0
+
+    # ---------- состояние ----------
+
+    def reset(self):
+        self.turns.clear()
+        self.summary.clear()
+        self.history_tokens = 0
+
+    def _check_idle(self):
+        if (self.turns or self.summary) and self.idle_reset_s > 0 and time.monotonic() - self.last_time > self.idle_reset_s:
+            self.reset()
+            self.resets += 1
+
+    def has_context(self) -> bool:
+        self._check_idle()
+        return bool(self.turns or self.summary)
+
+    # ---------- запись ----------
+
+    def add(self, user: str, assistant: str):
+        self._check_idle()
+        for role, text in (("user", user), ("assistant", assistant)):
+            if text:
+                turn = Turn(role, text)
+                self.turns.append(turn)
+                self.history_tokens += turn.tokens
+        self.last_time = time.monotonic()
+        self._evict()
+
+    def _evict(self):
+        # бюджет делим: сводка не больше summary_tokens, остальное — дословные реплики
+        limit = self.budget_tokens - (self.summary_tokens if self.summarize else 0)
+        while self.turns and self.history_tokens > limit:
+            turn = self.turns.popleft()
+            self.history_tokens -= turn.tokens
+            self.evicted += 1
+            if self.summarize:
+                self._fold_into_summary(turn)
+
+    def _fold_into_summary(self, turn: Turn):
+        # первая фраза реплики, не длиннее ~20 слов — без похода в LLM
+        first = re.split(r"(?<=[.!?])\s", turn.text.strip(), maxsplit=1)[0]
+        words = first.split()
+        if len(words) > 20:
+            first = " ".join(words[:20]) + "…"
+        who = "Пользователь" if turn.role == "user" else "Юко"
+        self.summary.append(f"{who}: {first}")
+        while self.summary and estimate_tokens("\n".join(self.summary)) > self.summary_tokens:
+            self.summary.pop(0)
+
+    # ---------- чтение ----------
+
+    def messages(self, system_prompt: str, user_msg: str) -> list[dict]:
+        """Сообщения для chat.completions: system (+ сводка), история, текущий вопрос"""
+        self._check_idle()
+        system = system_prompt
+        if self.summary:
+            system += "\nEarlier in this conversation (summary):\n" + "\n".join(self.summary)
+        msgs = [{"role": "system", "content": system}]
+        msgs.extend({"role": t.role, "content": t.text} for t in self.turns)
+        msgs.append({"role": "user", "content": user_msg})
+
+        self.prompt_tokens.append(sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in msgs))
+        return msgs
+
+    def report(self) -> str:
+        if not self.prompt_tokens:
+            return "Память разговора: запросов не было"
+        n = len(self.prompt_tokens)
+        return (
+            f"Память разговора: запросов {n}, токенов в запросе ~{sum(self.prompt_tokens) / n:.0f} "
+            f"(макс. {max(self.prompt_tokens)}), бюджет истории {self.budget_tokens}, "
+            f"вытеснено реплик {self.evicted}, сбросов по паузе {self.resets}"
+        )
+
+
+def load_memory() -> ConversationMemory | None:
+    """YUKO_MEMORY_TOKENS (0 — без памяти), YUKO_MEMORY_IDLE — секунд тишины до нового разговора"""
+    budget = int(os.environ.get("YUKO_MEMORY_TOKENS", "600"))
+    if budget <= 0:
+        return None
+    idle = float(os.environ.get("YUKO_MEMORY_IDLE", "300"))
+    return ConversationMemory(budget_tokens=budget, idle_reset_s=idle)
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    memory = ConversationMemory(budget_tokens=300)
+    system = "You are Yuko, a helpful AI assistant. Answer briefly in Russian, 2-4 sentences."
+    answer = (
+        "Чёрная дыра — область пространства, из которой не может вырваться даже свет. "
+        "Она образуется при коллапсе массивной звезды. Граница называется горизонтом событий."
+    )
+    for i in range(1, 16):
+        question = "расскажи про чёрные дыры" if i == 1 else "а подробнее?"
+        t0 = time.perf_counter()
+        memory.messages(system, question)
+        took = (time.perf_counter() - t0) * 1e6
+        memory.add(question, answer)
+        print(f"ход {i:2}: токенов в запросе {memory.prompt_tokens[-1]:4}, реплик {len(memory.turns):2}, "
+              f"строк сводки {len(memory.summary)}, {took:.0f} мкс")
+    print(memory.report())
@@ -0,0 +1,189 @@
+"""
+Исправление кривых распознаваний перед analyze()
+1) явные замены из words_config.CORRECTIONS (в том числе фразы: "ю туб" -> "ютуб")
+2) каждое незнакомое слово -> ближайшее слово словаря Юко (BK-дерево по Левенштейну)
+
+    python corrections.py "юко откой калькулятр"
+"""
+
+import re
+import sys
+
+from keyword_engine import LAUNCH_WORDS, normalize
+
+# Короткие слова нечётко не правим: "стол" легко превратился бы в "стоп" (= выход)
+MIN_FUZZY_LEN = 5
+LONG_WORD_LEN = 8  # с этой длины допускаем 2 ошибки
+
+
+def levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+class BKTree:
+    """BK-дерево: поиск слов в пределах расстояния без перебора всего словаря"""
+
+    def __init__(self, words=()):
+        self.root = None
+        self.size = 0
+        for w in words:
+            self.add(w)
+
+    def add(self, word: str):
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            d = levenshtein(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_dist: int) -> list[tuple[int, str]]:
+        """[(расстояние, слово)] отсортировано по расстоянию, потом по слову"""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            w, children = stack.pop()
+            d = levenshtein(word, w)
+            if d <= max_dist:
+                found.append((d, w))
+            for cd, child in children.items():
+                if d - max_dist <= cd <= d + max_dist:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+def vocabulary_from_config(cfg) -> set[str]:
+    """Канонические слова: wake-слова, ключевые слова интентов, алиасы приложений, триггеры"""
+    phrases = list(cfg.WAKE_WORDS) + list(cfg.BROWSER_TRIGGER_WORDS) + list(LAUNCH_WORDS)
+    for words in cfg.INTENT_KEYWORDS.values():
+        phrases.extend(words)
+    for wrong, canonical in cfg.APP_NAME_ALIASES.items():
+        phrases.extend((wrong, canonical))
+    phrases.extend(cfg.CORRECTIONS.values())
+
+    vocab = set()
+    for p in phrases:
+        vocab.update(normalize(p).split())
+    # явно ошибочные варианты из CORRECTIONS каноническими не считаем
+    for wrong in cfg.CORRECTIONS:
+        if wrong not in cfg.CORRECTIONS.values():
+            vocab.discard(normalize(wrong))
+    return vocab
+
+
+class Corrector:
+    def __init__(self, cfg):
+        self.vocab = vocabulary_from_config(cfg)
+        self.tree = BKTree(sorted(self.vocab))
+        self._cache: dict[str, str] = {}
+
+        # длинные замены раньше коротких, только целые слова
+        fixes = sorted(cfg.CORRECTIONS.items(), key=lambda kv: -len(kv[0]))
+        self._explicit = dict((normalize(k), v) for k, v in fixes)
+        if fixes:
+            pattern = "|".join(re.escape(normalize(k)) for k, _ in fixes)
+            self._explicit_re = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)")
+        else:
+            self._explicit_re = None
+
+        self.phrases = 0
+        self.applied = 0
+
+    def correct_token(self, token: str) -> str:
+        cached = self._cache.get(token)
+        if cached is not None:
+            return cached
+
+        result = token
+        if token not in self.vocab and len(token) >= MIN_FUZZY_LEN and token.isalpha():
+            limit = 2 if len(token) >= LONG_WORD_LEN else 1
+            found = self.tree.search(token, limit)
+            if found:
+                best_d = found[0][0]
+                best = [w for d, w in found if d == best_d]
+                if len(best) > 1:
+                    # при равенстве предпочитаем замену буквы вставке/удалению
+                    same_len = [w for w in best if len(w) == len(token)]
+                    best = same_len or best
+                # несколько одинаково близких кандидатов — не угадываем
+                if len(best) == 1 and len(best[0]) >= MIN_FUZZY_LEN:
+                    result = best[0]
+
+        self._cache[token] = result
+        return result
+
+    def _apply_explicit(self, t: str, applied: list) -> str:
+        if self._explicit_re is None:
+            return t
+
+        def repl(m):
+            new = self._explicit[m.group(0)]
+            applied.append((m.group(0), new))
+            return new
+        return self._explicit_re.sub(repl, t)
+
+    def explicit(self, text: str) -> str:
+        """Только явные замены из CORRECTIONS — для текста, который уходит в LLM и в слоты команд"""
+        return self._apply_explicit(normalize(text), [])
+
+    def correct(self, text: str) -> tuple[str, list[tuple[str, str]]]:
+        """
+        (исправленная фраза, [(было, стало), ...]) — с нечёткой подгонкой к словарю,
+        только для распознавания команд: "интерьер" здесь вполне может стать "интернет"
+        """
+        t = normalize(text)
+        applied = []
+        t = self._apply_explicit(t, applied)
+
+        tokens = re.findall(r"\w+|\W+", t)
+        out = []
+        for tok in tokens:
+            if tok[0].isalnum():
+                fixed = self.correct_token(tok)
+                if fixed != tok:
+                    applied.append((tok, fixed))
+                out.append(fixed)
+            else:
+                out.append(tok)
+
+        self.phrases += 1
+        self.applied += len(applied)
+        return "".join(out), applied
+
+    def report(self) -> str:
+        return (
+            f"Исправления: фраз {self.phrases}, замен {self.applied}, "
+            f"словарь {len(self.vocab)}, кэш {len(self._cache)}"
+        )
+
+
+if __name__ == "__main__":
+    import words_config
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    corrector = Corrector(words_config)
+    for phrase in sys.argv[1:] or ["юка открой калькулятр", "открой ютаб", "запусти дискорт"]:
+        fixed, applied = corrector.correct(phrase)
+        print(f"{phrase!r} -> {fixed!r}  {applied}")
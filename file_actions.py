@@ -3,6 +3,8 @@ from pathlib import Path
 
 from send2trash import send2trash  # pip install send2trash
 
+from path_policy import PathPolicy
+
 USER_HOME = Path.home()
 
 ALLOWED_ROOTS = [
@@ -26,56 +28,48 @@ def _normalize(path: Path) -> Path:
     return path.expanduser().resolve()
 
 
-def _is_under(root: Path, path: Path) -> bool:
-    root = _normalize(root)
-    path = _normalize(path)
-    try:
-        path.relative_to(root)
-        return True
-    except ValueError:
-        return False
+_policy = None
+
+
+def get_policy() -> PathPolicy:
+    # корни разрешаются один раз; поменяли списки выше — политика пересобирается
+    global _policy
+    if _policy is None or _policy.source != (tuple(ALLOWED_ROOTS), tuple(FORBIDDEN_PREFIXES)):
+        _policy = PathPolicy(ALLOWED_ROOTS, FORBIDDEN_PREFIXES)
+    return _policy
 
 
 def _is_allowed(path: Path) -> bool:
-    path = _normalize(path)
+    return get_policy().is_allowed(path)
+
 
-    for fb in FORBIDDEN_PREFIXES:
-        if _is_under(fb, path):
-            return False
+def iter_search_file(query: str, max_results: int = 10, deadline_s: float | None = None, cancel=None):
+    # постоянный индекс (file_index.py); пока он собирается первый раз —
+    # параллельный обход папок (file_search.py), результаты по мере нахождения
+    from file_index import get_file_index
 
-    return any(_is_under(root, path) for root in ALLOWED_ROOTS)
+    index = get_file_index()
+    if index is not None and index.ready:
+        yield from index.search(query, max_results)
+        return
+
+    from file_search import iter_search
+    policy = get_policy()
+    yield from iter_search(
+        query, ALLOWED_ROOTS, policy.is_allowed, policy.check_resolved,
+        max_results=max_results, deadline_s=deadline_s, cancel=cancel,
+    )
 
 
 def search_file(query: str, max_results: int = 10):
-    query = query.strip().lower()
-    results: list[Path] = []
-
-    for root in ALLOWED_ROOTS:
-        root = _normalize(root)
-        if not root.exists():
-            continue
-
-        for dirpath, dirnames, filenames in os.walk(root):
-            depth = Path(dirpath).relative_to(root).parts
-            if len(depth) > 5:
-                dirnames[:] = []
-                continue
-
-            for name in filenames:
-                if query in name.lower():
-                    p = Path(dirpath) / name
-                    if _is_allowed(p):
-                        results.append(p)
-                        if len(results) >= max_results:
-                            return results
-    return results
+    return list(iter_search_file(query, max_results))
 
 
 def open_file(path_str: str):
     path = _normalize(Path(path_str))
     if not path.exists():
         raise FileNotFoundError(path)
-    if not _is_allowed(path):
+    if not get_policy().check_resolved(path):
         raise PermissionError("Path is outside allowed user folders")
     os.startfile(str(path))
 
@@ -84,7 +78,7 @@ def show_in_explorer(path_str: str):
     path = _normalize(Path(path_str))
     if not path.exists():
         raise FileNotFoundError(path)
-    if not _is_allowed(path):
+    if not get_policy().check_resolved(path):
         raise PermissionError("Path is outside allowed user folders")
 
     if path.is_dir():
@@ -102,6 +96,6 @@ def delete_file(path_str: str):
     path = _normalize(Path(path_str))
     if not path.exists():
         raise FileNotFoundError(path)
-    if not _is_allowed(path):
+    if not get_policy().check_resolved(path):
         raise PermissionError("Path is outside allowed user folders")
     send2trash(str(path))
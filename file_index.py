@@ -0,0 +1,403 @@
+"""
+Постоянный индекс имён файлов для search_file()
+Все файлы из ALLOWED_ROOTS лежат в SQLite (yuko_data/file_index.sqlite3) с FTS5-таблицей
+на триграммах, поэтому поиск по подстроке — миллисекунды вместо обхода диска.
+Обновление инкрементальное: у каждой папки запомнен mtime, и папка перечитывается,
+только если он изменился (mtime папки меняется при добавлении/удалении/переименовании в ней).
+
+    python file_index.py --rebuild        # собрать индекс с нуля
+    python file_index.py отчёт диплом     # поиск + время
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+INDEX_PATH = Path(__file__).parent / "yuko_data" / "file_index.sqlite3"
+MAX_DEPTH = 5          # как в старом search_file: глубже папок не заходим
+REFRESH_INTERVAL = 60.0
+# индекс старше этого — поиск отвечает сразу, а полное обновление запускает в фоне;
+# сами корни (Загрузки, Рабочий стол, ...) перепроверяются прямо перед ответом — это пара stat
+STALE_AFTER = 3.0
+# правка файла на месте mtime папки не меняет: при каждом обновлении перепроверяем
+# столько самых свежих файлов и файлы папок, менявшихся за последние ACTIVE_REFRESHES обновлений
+RESTAT_RECENT = 500
+ACTIVE_REFRESHES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    subdirs  TEXT NOT NULL            -- имена подпапок через \\n
+);
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    dir      TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    lname    TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    lname, content='files', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, lname) VALUES (new.id, new.lname);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, lname) VALUES ('delete', old.id, old.lname);
+END;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# ранг: имя без расширения совпало целиком > имя начинается с запроса > запрос с начала слова > где-то внутри
+RANK_SQL = """
+    CASE
+        WHEN lname = :q OR lname LIKE :q || '.%' ESCAPE '\\' THEN 0
+        WHEN lname LIKE :prefix ESCAPE '\\' THEN 1
+        WHEN lname LIKE :word1 ESCAPE '\\' OR lname LIKE :word2 ESCAPE '\\'
+          OR lname LIKE :word3 ESCAPE '\\' THEN 2
+        ELSE 3
+    END
+"""
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class FileIndex:
+    def __init__(self, roots, is_allowed, path: Path = INDEX_PATH, max_depth: int = MAX_DEPTH):
+        self.roots = [Path(r) for r in roots]
+        self.is_allowed = is_allowed
+        self.path = Path(path)
+        self.max_depth = max_depth
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.last_refresh = None  # (секунды, папок проверено, папок перечитано)
+        self.refreshed_at = None  # time.monotonic() конца последнего обновления
+        self._active: dict[str, int] = {}  # папка -> сколько обновлений ещё перепроверять её файлы
+
+    # ---------- обновление ----------
+
+    @property
+    def ready(self) -> bool:
+        """Индекс хотя бы раз собран до конца"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'complete'").fetchone()
+        return row is not None
+
+    def refresh(self) -> tuple[float, int, int]:
+        """Инкрементальное обновление; (секунды, папок проверено, папок перечитано)"""
+        with self._refresh_lock:
+            t0 = time.perf_counter()
+            with self._lock:
+                known = {
+                    path: (mtime, subdirs.split("\n") if subdirs else [])
+                    for path, mtime, subdirs in self._db.execute("SELECT path, mtime_ns, subdirs FROM dirs")
+                }
+            seen = set()
+            checked = rescanned = 0
+
+            for root in self.roots:
+                root = root.expanduser().resolve()
+                stack = [(root, 0)]
+                while stack:
+                    d, depth = stack.pop()
+                    key = str(d)
+                    try:
+                        mtime = os.stat(d).st_mtime_ns
+                    except OSError:
+                        continue
+                    # ссылки на папки не проходим, так что ниже корня проверять достаточно сам корень
+                    if depth == 0 and not self.is_allowed(d):
+                        continue
+                    seen.add(key)
+                    checked += 1
+
+                    old = known.get(key)
+                    if old is not None and old[0] == mtime:
+                        subdirs = old[1]
+                    else:
+                        subdirs = self._rescan(d, mtime)
+                        rescanned += 1
+                        self._active[key] = ACTIVE_REFRESHES + 1
+                    if depth < self.max_depth:
+                        stack.extend((d / name, depth + 1) for name in subdirs)
+
+            gone = [k for k in known if k not in seen]
+            with self._lock, self._db:
+                for key in gone:
+                    self._db.execute("DELETE FROM files WHERE dir = ?", (key,))
+                    self._db.execute("DELETE FROM dirs WHERE path = ?", (key,))
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('complete', ?)", (str(time.time()),))
+
+            self._restat_files()
+
+            self.last_refresh = (time.perf_counter() - t0, checked, rescanned)
+            self.refreshed_at = time.monotonic()
+            return self.last_refresh
+
+    def _restat_files(self):
+        """Свежие файлы и файлы недавно менявшихся папок: stat по одному, mtime_ns — как на диске"""
+        for key in list(self._active):
+            self._active[key] -= 1
+            if self._active[key] <= 0:
+                del self._active[key]
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, dir, name, mtime_ns FROM files ORDER BY mtime_ns DESC LIMIT ?", (RESTAT_RECENT,)
+            ).fetchall()
+            for key in self._active:
+                rows += self._db.execute("SELECT id, dir, name, mtime_ns FROM files WHERE dir = ?", (key,)).fetchall()
+        changed = []
+        for file_id, d, name, mtime in rows:
+            try:
+                now = os.stat(os.path.join(d, name)).st_mtime_ns
+            except OSError:
+                continue
+            if now != mtime:
+                changed.append((now, file_id))
+        if changed:
+            with self._lock, self._db:
+                self._db.executemany("UPDATE files SET mtime_ns = ? WHERE id = ?", changed)
+
+    def ensure_fresh(self, max_age_s: float = STALE_AFTER) -> bool:
+        """
+        Перед поиском. Индекс давно не обновлялся — сейчас (если никто не обновляет) перепроверяем
+        только корни; True — после ответа запустить полное обновление в фоне (catch_up), запрос его не ждёт
+        """
+        if self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= max_age_s:
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False  # обновление уже идёт
+        try:
+            self._refresh_roots()
+        finally:
+            self._refresh_lock.release()
+        return True
+
+    def catch_up(self):
+        threading.Thread(target=self._catch_up, daemon=True).start()
+
+    def _refresh_roots(self):
+        for root in self.roots:
+            root = root.expanduser().resolve()
+            key = str(root)
+            try:
+                mtime = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            with self._lock:
+                row = self._db.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (key,)).fetchone()
+            if row is not None and row[0] != mtime and self.is_allowed(root):
+                self._rescan(root, mtime)
+                self._active[key] = ACTIVE_REFRESHES + 1
+
+    def _catch_up(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print("Юко: не смогла обновить индекс файлов:", e)
+
+    def _rescan(self, d: Path, mtime: int) -> list[str]:
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append((entry.name, entry.stat().st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+
+        key = str(d)
+        with self._lock, self._db:
+            # разница с тем, что уже в индексе: в большой папке (Загрузки) меняется пара файлов,
+            # а удаление+вставка всех строк гоняет FTS-триггеры по тысячам имён
+            old = {name: (file_id, m) for file_id, name, m in self._db.execute(
+                "SELECT id, name, mtime_ns FROM files WHERE dir = ?", (key,))}
+            new = dict(files)
+            self._db.executemany(
+                "DELETE FROM files WHERE id = ?", [(old[name][0],) for name in old.keys() - new.keys()]
+            )
+            self._db.executemany(
+                "INSERT INTO files(dir, name, lname, mtime_ns) VALUES (?, ?, ?, ?)",
+                [(key, name, name.lower(), m) for name, m in new.items() if name not in old],
+            )
+            self._db.executemany(
+                "UPDATE files SET mtime_ns = ? WHERE id = ?",
+                [(m, old[name][0]) for name, m in new.items() if name in old and old[name][1] != m],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (key, mtime, "\n".join(subdirs))
+            )
+        return subdirs
+
+    def rebuild(self):
+        with self._refresh_lock, self._lock, self._db:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM dirs")
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild')")
+        return self.refresh()
+
+    def start(self, interval: float = REFRESH_INTERVAL):
+        """Фоновое обновление: сразу и затем раз в interval секунд"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _loop(self, interval: float):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Юко: не смогла обновить индекс файлов:", e)
+            if self._stop.wait(interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- поиск ----------
+
+    def search(self, query: str, max_results: int = 10) -> list[Path]:
+        q = query.strip().lower()
+        if not q:
+            return []
+        stale = self.ensure_fresh()
+        e = _like_escape(q)
+        params = {
+            "q": e, "prefix": e + "%",
+            "word1": "% " + e + "%", "word2": "%\\_" + e + "%", "word3": "%-" + e + "%",
+            # с запасом: часть кандидатов может отсеяться проверками ниже
+            "limit": max_results * 3 + 10,
+        }
+        if len(q) >= 3:
+            # FTS5 trigram: подстрока любой длины от 3 символов
+            params["match"] = '"' + q.replace('"', '""') + '"'
+            sql = f"""
+                SELECT dir, name FROM files
+                WHERE id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH :match)
+                ORDER BY {RANK_SQL}, length(lname), mtime_ns DESC
+                LIMIT :limit
+            """
+        else:
+            sql = f"""
+                SELECT dir, name FROM files WHERE lname LIKE '%' || :q || '%' ESCAPE '\\'
+                ORDER BY {RANK_SQL}, length(lname), mtime_ns DESC
+                LIMIT :limit
+            """
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        if stale:
+            self.catch_up()
+
+        results = []
+        for d, name in rows:
+            p = Path(d) / name
+            # индекс мог отстать от диска; права проверяем так же, как для open_file/delete_file
+            if p.exists() and self.is_allowed(p):
+                results.append(p)
+                if len(results) >= max_results:
+                    break
+        return results
+
+    def latest(self, roots, n: int = 5, ext: str | None = None, skip=None) -> list[Path]:
+        """Последние n файлов по mtime под roots; skip(имя) -> True — пропустить (недокачанные и т.п.)"""
+        where = []
+        params: dict = {"limit": n * 3 + 10}
+        for i, root in enumerate(roots):
+            root = str(Path(root).expanduser().resolve())
+            params[f"r{i}"] = root
+            params[f"p{i}"] = _like_escape(root + os.sep) + "%"
+            where.append(f"dir = :r{i} OR dir LIKE :p{i} ESCAPE '\\'")
+        if not where:
+            return []
+        stale = self.ensure_fresh()
+        sql = f"SELECT dir, name FROM files WHERE ({' OR '.join(where)})"
+        if ext:
+            params["ext"] = "%." + _like_escape(ext.lower().lstrip("."))
+            sql += " AND lname LIKE :ext ESCAPE '\\'"
+        sql += " ORDER BY mtime_ns DESC LIMIT :limit"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        if stale:
+            self.catch_up()
+
+        results = []
+        for d, name in rows:
+            if skip is not None and skip(name):
+                continue
+            p = Path(d) / name
+            if p.exists() and self.is_allowed(p):
+                results.append(p)
+                if len(results) >= n:
+                    break
+        return results
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM files").fetchone()[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_file_index() -> FileIndex | None:
+    """Общий индекс по ALLOWED_ROOTS; None — SQLite без FTS5 trigram (нужна версия 3.34+)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from file_actions import ALLOWED_ROOTS, _is_allowed
+            try:
+                _index = FileIndex(ALLOWED_ROOTS, _is_allowed)
+            except sqlite3.OperationalError as e:
+                print("Юко: индекс файлов недоступен, ищу обходом папок:", e)
+                _index = False
+        return _index or None
+
+
+def start_file_index():
+    index = get_file_index()
+    if index is not None:
+        index.start()
+    return index
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    index = get_file_index()
+    if index is None:
+        sys.exit(1)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    took, checked, rescanned = index.rebuild() if "--rebuild" in sys.argv else index.refresh()
+    print(f"Обновление: {took * 1000:.0f} мс, папок {checked}, перечитано {rescanned}, файлов {len(index)}")
+    for q in args:
+        t0 = time.perf_counter()
+        found = index.search(q)
+        print(f"{q!r}: {len(found)} за {(time.perf_counter() - t0) * 1000:.1f} мс")
+        for p in found:
+            print("   ", p)
@@ -0,0 +1,225 @@
+"""
+Параллельный поиск файлов по имени без индекса
+Корни обходятся одновременно пулом потоков через os.scandir; имя сравнивается как строка,
+Path создаётся только для совпадений. Результаты отдаются генератором по мере нахождения,
+поиск можно прервать токеном отмены (threading.Event) или ограничить по времени.
+
+    python file_search.py --bench [число файлов]   # сравнение со старым os.walk на синтетическом дереве
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+MAX_DEPTH = 5
+_DONE = object()
+
+
+def iter_search(
+    query: str,
+    roots,
+    is_allowed,
+    check_resolved=None,
+    max_results: int = 10,
+    max_depth: int = MAX_DEPTH,
+    deadline_s: float | None = None,
+    cancel: threading.Event | None = None,
+    workers: int | None = None,
+):
+    """
+    Генератор Path совпадений. is_allowed(Path) вызывается для корней и для ссылок;
+    обычные файлы под корнем уже "разрешены" (os.scandir не даёт '..', по ссылкам не ходим),
+    их проверяет check_resolved(путь) без обращений к диску (см. path_policy.PathPolicy).
+    """
+    q = query.strip().lower()
+    if not q:
+        return
+    stop = threading.Event()
+    deadline = time.monotonic() + deadline_s if deadline_s else None
+
+    dirs: queue.Queue = queue.Queue()
+    results: queue.Queue = queue.Queue()
+
+    for root in roots:
+        root = Path(root).expanduser().resolve()
+        if root.is_dir() and is_allowed(root):
+            dirs.put((str(root), 0))
+
+    def allowed(entry) -> bool:
+        if entry.is_symlink():
+            # ссылка может вести куда угодно — полная проверка, как у open_file/delete_file
+            return is_allowed(Path(entry.path))
+        return check_resolved is None or check_resolved(entry.path)
+
+    def worker():
+        while True:
+            try:
+                d, depth = dirs.get(timeout=0.05)
+            except queue.Empty:
+                if stop.is_set():
+                    return
+                continue
+            if stop.is_set():
+                # поиск окончен — оставшиеся папки только снимаем с очереди, чтобы dirs.join() вернулся
+                dirs.task_done()
+                continue
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        if stop.is_set():
+                            break
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if depth < max_depth:
+                                    dirs.put((entry.path, depth + 1))
+                            elif q in entry.name.lower() and entry.is_file() and allowed(entry):
+                                results.put(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            finally:
+                dirs.task_done()
+
+    def watcher():
+        # все папки разобраны — сообщаем генератору
+        dirs.join()
+        results.put(_DONE)
+
+    n = workers or min(8, (os.cpu_count() or 2) * 2)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(n)]
+    threads.append(threading.Thread(target=watcher, daemon=True))
+    for t in threads:
+        t.start()
+
+    found = 0
+    try:
+        while found < max_results:
+            if cancel is not None and cancel.is_set():
+                return
+            timeout = 0.1
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return
+                timeout = min(timeout, left)
+            try:
+                item = results.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            found += 1
+            yield Path(item)
+    finally:
+        stop.set()
+
+
+# ---------- замер ----------
+
+def _legacy_walk(query: str, roots, is_allowed, max_results: int = 10):
+    """Копия прежнего file_actions.search_file — для сравнения"""
+    query = query.strip().lower()
+    results = []
+    for root in roots:
+        root = Path(root).expanduser().resolve()
+        if not root.exists():
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            depth = Path(dirpath).relative_to(root).parts
+            if len(depth) > 5:
+                dirnames[:] = []
+                continue
+            for name in filenames:
+                if query in name.lower():
+                    p = Path(dirpath) / name
+                    if is_allowed(p):
+                        results.append(p)
+                        if len(results) >= max_results:
+                            return results
+    return results
+
+
+def _make_tree(base: Path, n_files: int):
+    import random
+
+    rng = random.Random(7)
+    words = ["отчёт", "диплом", "budget", "photo", "курсовая", "invoice", "report", "смета", "draft", "notes"]
+    roots = [base / name for name in ("Desktop", "Documents", "Downloads", "Pictures", "Videos")]
+    per_dir = 50
+    made = 0
+    while made < n_files:
+        root = rng.choice(roots)
+        d = root.joinpath(*[f"{rng.choice(words)}_{rng.randint(0, 30)}" for _ in range(rng.randint(0, 6))])
+        d.mkdir(parents=True, exist_ok=True)
+        for _ in range(per_dir):
+            name = f"{rng.choice(words)}_{rng.randint(0, 10**6)}.{rng.choice(['docx', 'pdf', 'jpg', 'txt'])}"
+            (d / name).touch()
+            made += 1
+    for root in roots:
+        root.mkdir(exist_ok=True)
+    return roots
+
+
+def bench(n_files: int = 100_000):
+    import tempfile
+
+    from path_policy import PathPolicy
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp).resolve()
+        t0 = time.perf_counter()
+        roots = _make_tree(base, n_files)
+        print(f"Дерево: {n_files} файлов за {time.perf_counter() - t0:.1f} с")
+
+        forbidden = [base / "AppData", Path("C:/Windows"), Path("C:/Program Files")]
+        policy = PathPolicy(roots, forbidden)
+
+        def is_allowed(p: Path) -> bool:
+            # как прежний file_actions._is_allowed: resolve() всех корней на каждую проверку
+            p = p.expanduser().resolve()
+            for fb in forbidden:
+                try:
+                    p.relative_to(fb.resolve())
+                    return False
+                except ValueError:
+                    pass
+            for root in roots:
+                try:
+                    p.relative_to(root.resolve())
+                    return True
+                except ValueError:
+                    pass
+            return False
+
+        for query, limit in (("смета_12", 10), ("смета_12", 10**9), ("несуществующее", 10**9)):
+            t0 = time.perf_counter()
+            old = _legacy_walk(query, roots, is_allowed, limit)
+            t_old = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            first = None
+            new = []
+            for p in iter_search(query, roots, policy.is_allowed, policy.check_resolved, max_results=limit):
+                if first is None:
+                    first = time.perf_counter() - t0
+                new.append(p)
+            t_new = time.perf_counter() - t0
+            first_ms = f"{first * 1000:.0f} мс" if first is not None else "—"
+
+            same = set(old) == set(new) if limit > 10 else len(old) == len(new)
+            lim = "все" if limit > 10 else str(limit)
+            print(f"{query!r} ({lim}): os.walk {t_old * 1000:6.0f} мс | scandir {t_new * 1000:6.0f} мс, "
+                  f"первый через {first_ms}, найдено {len(new)}, совпадает: {same}")
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    if "--bench" in sys.argv:
+        args = [a for a in sys.argv[1:] if a.isdigit()]
+        bench(int(args[0]) if args else 100_000)
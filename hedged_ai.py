@@ -0,0 +1,174 @@
+"""
+Ответ ИИ с бюджетом по времени: медленная сеть не должна замораживать голосовой цикл
+Запрос в LLM идёт в фоновом потоке, офлайн-ответ считается параллельно.
+Не успели за бюджет: есть уверенный офлайн-ответ — отдаём его, иначе говорим "думаю…"
+и ждём ещё немного. Опоздавший ответ отменяется и молча выбрасывается.
+
+    python hedged_ai.py --demo   # проверка на нарочно медленном локальном сервере
+"""
+
+import os
+import sys
+import threading
+import time
+
+
+class HedgedCall:
+    """
+    fn(call) в фоновом потоке.
+    Потоковый fn вызывает call.begin() перед первым выводом; обычный считается начатым, когда вернулся.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.result = None
+        self.error = None
+        self.ready = threading.Event()  # начал отвечать или закончил (успешно или нет)
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._begun = False
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            result = self.fn(self)
+            with self._lock:
+                if not self._cancelled:
+                    self._begun = True
+                    self.result = result
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+            self.ready.set()
+
+    def begin(self) -> bool:
+        """False — ответ уже не нужен, выводить ничего нельзя"""
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._begun = True
+        self.ready.set()
+        return True
+
+    def cancel(self) -> bool:
+        """False — поздно: ответ уже начал выводиться"""
+        with self._lock:
+            if self._begun:
+                return False
+            self._cancelled = True
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+class Hedger:
+    def __init__(self, budget_s: float = 2.5, patience_s: float = 8.0):
+        self.budget_s = budget_s
+        self.patience_s = patience_s
+        self.stats = {"remote": 0, "late": 0, "offline": 0, "timeout": 0, "failed": 0}
+        self.wait_time = 0.0
+
+    @property
+    def request_timeout(self) -> float:
+        """Таймаут HTTP-запроса: дольше ждать всё равно не станем"""
+        return self.budget_s + self.patience_s + 1.0
+
+    def ask(self, remote, offline, on_thinking=None) -> tuple[object, str]:
+        """
+        remote(call) -> ответ или None; offline() -> уверенный ответ или None.
+        Возвращает (ответ, источник): remote / late / offline / timeout / failed.
+        При offline / timeout / failed ответ — офлайн (может быть None).
+        """
+        t0 = time.perf_counter()
+        call = HedgedCall(remote)
+        fallback = offline()
+        source = self._wait(call, fallback, on_thinking)
+        self.stats[source] += 1
+        self.wait_time += time.perf_counter() - t0
+
+        if source in ("remote", "late"):
+            # потоковый ответ уже выводится — дожидаемся конца
+            call.done.wait()
+            if call.result is not None:
+                return call.result, source
+            source = "failed"
+        return fallback, source
+
+    def _wait(self, call: HedgedCall, fallback, on_thinking) -> str:
+        # cancel() не удался — значит, ответ как раз начал выводиться
+        if call.ready.wait(self.budget_s) or (fallback is not None and not call.cancel()):
+            return "remote" if self._usable(call) else "failed"
+        if fallback is not None:
+            return "offline"
+
+        if on_thinking is not None:
+            on_thinking()
+        if call.ready.wait(self.patience_s) or not call.cancel():
+            return "late" if self._usable(call) else "failed"
+        return "timeout"
+
+    @staticmethod
+    def _usable(call: HedgedCall) -> bool:
+        if not call.done.is_set():
+            return True  # начал выводить потоком
+        return call.error is None and call.result is not None
+
+    def report(self) -> str:
+        total = sum(self.stats.values())
+        avg = self.wait_time / total * 1000 if total else 0.0
+        s = self.stats
+        return (
+            f"Бюджет ответа {self.budget_s:.1f} с: вовремя {s['remote']}, после \"думаю\" {s['late']}, "
+            f"офлайн вместо сети {s['offline']}, не дождались {s['timeout']}, ошибок {s['failed']}, "
+            f"ожидание в среднем {avg:.0f} мс"
+        )
+
+
+def load_hedger() -> Hedger | None:
+    """YUKO_LLM_BUDGET — сколько секунд ждать сеть (0 — ждать, сколько потребуется), YUKO_LLM_PATIENCE — после "думаю…" """
+    budget = float(os.environ.get("YUKO_LLM_BUDGET", "2.5"))
+    if budget <= 0:
+        return None
+    patience = float(os.environ.get("YUKO_LLM_PATIENCE", "8"))
+    return Hedger(budget, patience)
+
+
+# ---------- проверка на медленном сервере ----------
+
+def demo():
+    from groq import Groq
+    from streaming_llm import start_stub_server, stream_completion
+
+    request = {"model": "stub", "messages": [{"role": "user", "content": "расскажи про ютуб"}]}
+
+    for delay, offline_answer in ((0.2, None), (1.5, None), (1.5, "Офлайн-ответ."), (6.0, None)):
+        server = start_stub_server(first_token_delay=delay)
+        host, port = server.server_address
+        hedger = Hedger(budget_s=1.0, patience_s=2.0)
+        client = Groq(api_key="stub", base_url=f"http://{host}:{port}", timeout=hedger.request_timeout)
+
+        def remote(call):
+            res = stream_completion(client, lambda text: None, lambda ct, p: None, begin=call.begin, **request)
+            return None if res.cancelled else res.text
+
+        t0 = time.perf_counter()
+        answer, source = hedger.ask(remote, lambda: offline_answer, on_thinking=lambda: print("   Юко: думаю…"))
+        took = (time.perf_counter() - t0) * 1000
+        print(f"сервер {delay:.1f} с, офлайн {'есть' if offline_answer else 'нет'}: "
+              f"{source:<8} за {took:5.0f} мс  {str(answer)[:40]!r}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    if "--demo" in sys.argv:
+        demo()
+    else:
+        print(__doc__)
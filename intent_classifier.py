@@ -0,0 +1,266 @@
+"""
+Локальный классификатор команд: фраза -> тег действия без похода в LLM
+Хешированные символьные n-граммы + TF-IDF, скоринг одним умножением матрицы на вектор.
+Примеры для обучения — intent_examples.json (класс "ai" = отдать в LLM).
+
+    python intent_classifier.py --eval   # точность и задержка на тестовых фразах
+"""
+
+import json
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+EXAMPLES_PATH = Path(__file__).parent / "intent_examples.json"
+
+N_FEATURES = 1 << 14
+NGRAMS = (2, 3, 4)
+FALLBACK_LABEL = "ai"
+
+# вопрос ("как найти файл на компьютере") — это к LLM, даже если похоже на команду
+QUESTION_WORDS = {
+    "как", "что", "где", "почему", "зачем", "когда", "кто", "какой", "какая", "какое", "какие",
+    "сколько", "чем", "куда", "откуда", "ли", "можно", "нужно", "стоит",
+}
+# слот с предлогом места в начале — хвост фразы, а не имя ("файл на компьютере", "документ в ворде");
+# "про"/"о" оставляем: "видео про динозавров" — нормальный запрос
+SLOT_STOP_PREPOSITIONS = {"в", "во", "на", "у", "из", "с", "со", "к", "ко", "по", "за", "от", "до", "для"}
+
+
+def normalize(text: str) -> str:
+    text = text.lower().replace("ё", "е")
+    return " ".join(re.findall(r"\w+", text))
+
+
+def features(text: str) -> dict[int, float]:
+    """Символьные n-граммы слов с границами, захешированные в N_FEATURES корзин"""
+    counts: dict[int, float] = {}
+    for word in normalize(text).split():
+        w = f" {word} "
+        for n in NGRAMS:
+            for i in range(len(w) - n + 1):
+                h = zlib.crc32(w[i:i + n].encode("utf-8")) % N_FEATURES
+                counts[h] = counts.get(h, 0.0) + 1.0
+    return counts
+
+
+class IntentClassifier:
+    # ложное срабатывание — действие без LLM в ответ на вопрос, поэтому пороги с запасом:
+    # на отложенных вопросах со словами "файл"/"интернет"/"ютуб" ни одного действия (см. --eval)
+    def __init__(self, min_score: float = 0.35, min_margin: float = 0.1):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.labels: list[str] = []
+        self.slot_markers: dict[str, list[str]] = {}
+        self.verbs: dict[str, set[str]] = {}
+        self.idf = np.ones(N_FEATURES, dtype=np.float32)
+        self.examples = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.example_labels = np.zeros(0, dtype=np.int64)
+
+        self.calls = 0
+        self.local_hits = 0
+        self.total_time = 0.0
+
+    # ---------- обучение ----------
+
+    def fit(self, data: dict):
+        """data: {метка: {"examples": [...], "slot_after": [...], "verbs": [...]}}"""
+        self.labels = sorted(data)
+        # команда только с "своим" глаголом: "удали файл отчёт" похоже на поиск, но это не поиск
+        self.verbs = {label: {normalize(v) for v in spec.get("verbs", [])} for label, spec in data.items()}
+        self.slot_markers = {
+            label: sorted((normalize(m) for m in spec.get("slot_after", [])), key=len, reverse=True)
+            for label, spec in data.items()
+        }
+
+        docs = []
+        for label in self.labels:
+            for text in data[label]["examples"]:
+                docs.append((label, features(text)))
+
+        df = np.zeros(N_FEATURES, dtype=np.float32)
+        for _, feats in docs:
+            df[list(feats)] += 1
+        self.idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+
+        # примеров немного, поэтому храним их все: оценка класса = ближайший пример (1-NN)
+        self.examples = np.stack([self._vector(feats) for _, feats in docs])
+        self.example_labels = np.array([self.labels.index(label) for label, _ in docs])
+        return self
+
+    def _vector(self, feats: dict[int, float]) -> np.ndarray:
+        v = np.zeros(N_FEATURES, dtype=np.float32)
+        if feats:
+            idx = np.fromiter(feats.keys(), dtype=np.int64)
+            tf = np.fromiter(feats.values(), dtype=np.float32)
+            v[idx] = (1 + np.log(tf)) * self.idf[idx]
+            v /= max(float(np.linalg.norm(v)), 1e-9)
+        return v
+
+    # ---------- предсказание ----------
+
+    def scores(self, text: str) -> np.ndarray:
+        """Косинусная близость к ближайшему примеру каждого класса"""
+        sims = self.examples @ self._vector(features(text))
+        per_class = np.full(len(self.labels), -1.0, dtype=np.float32)
+        np.maximum.at(per_class, self.example_labels, sims)
+        return per_class
+
+    def extract_slot(self, label: str, text: str) -> str:
+        """
+        Всё, что после первого маркера и идущих за ним маркеров ("найди в интернете <рецепт пиццы>");
+        "" — слота нет или он начинается с предлога места
+        """
+        t = normalize(text)
+        markers = self.slot_markers.get(label, [])
+        best = None
+        for marker in markers:
+            m = re.search(rf"(?<!\w){re.escape(marker)}(?!\w)", t)
+            if m and (best is None or m.end() < best):
+                best = m.end()
+        if best is None:
+            return ""
+        # "найди | в интернете | ..." — подряд идущие маркеры (в том числе с предлогом) тоже пропускаем
+        moved = True
+        while moved:
+            moved = False
+            for marker in markers:
+                m = re.match(rf"\s*(?:(?:в|во|на)\s+)?{re.escape(marker)}(?!\w)", t[best:])
+                if m:
+                    best += m.end()
+                    moved = True
+                    break
+        slot = t[best:].strip()
+        if slot.split(" ", 1)[0] in SLOT_STOP_PREPOSITIONS:
+            return ""
+        return slot
+
+    def predict(self, text: str) -> tuple[str, str, float]:
+        """(метка, слот, уверенность); метка FALLBACK_LABEL — отдать в LLM"""
+        t0 = time.perf_counter()
+        s = self.scores(text)
+        best = int(np.argmax(s))
+        top = float(s[best])
+        label = self.labels[best]
+        # отрыв считаем от класса "ai": спутать две команды не так страшно, как ответить командой на вопрос
+        ai_score = float(s[self.labels.index(FALLBACK_LABEL)]) if FALLBACK_LABEL in self.labels else 0.0
+
+        slot = ""
+        words = normalize(text).split()
+        if top < self.min_score or top - ai_score < self.min_margin:
+            label = FALLBACK_LABEL
+        elif words and words[0] in QUESTION_WORDS:
+            label = FALLBACK_LABEL
+        elif self.verbs.get(label) and not self.verbs[label].intersection(words):
+            label = FALLBACK_LABEL
+        elif label != FALLBACK_LABEL:
+            slot = self.extract_slot(label, text)
+            if not slot:
+                # команда без параметра ("найди файл") — пусть разбирается LLM
+                label = FALLBACK_LABEL
+
+        self.calls += 1
+        self.total_time += time.perf_counter() - t0
+        if label != FALLBACK_LABEL:
+            self.local_hits += 1
+        return label, slot, top
+
+    def report(self) -> str:
+        avg = self.total_time / self.calls * 1e6 if self.calls else 0.0
+        return f"Классификатор: фраз {self.calls}, без LLM {self.local_hits}, в среднем {avg:.0f} мкс"
+
+
+def load_examples(path: Path = EXAMPLES_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_classifier(path: Path = EXAMPLES_PATH) -> IntentClassifier | None:
+    if not path.is_file():
+        return None
+    try:
+        return IntentClassifier().fit(load_examples(path))
+    except Exception as e:
+        print("Юко: не смогла обучить локальный классификатор:", e)
+        return None
+
+
+# ---------- оценка ----------
+
+class Tally:
+    """Точность действий: из сработавших команд сколько верных, и сколько вопросов ушло в команду"""
+
+    def __init__(self):
+        self.fired = self.right = 0
+        self.questions = self.questions_fired = 0
+
+    def add(self, label: str, pred: str):
+        if pred != FALLBACK_LABEL:
+            self.fired += 1
+            self.right += pred == label
+        if label == FALLBACK_LABEL:
+            self.questions += 1
+            self.questions_fired += pred != FALLBACK_LABEL
+
+    def report(self) -> str:
+        precision = f"{self.right / self.fired:.0%}" if self.fired else "—"
+        return (f"{self.right}/{self.fired} ({precision}), "
+                f"вопросов выполнено командой {self.questions_fired}/{self.questions}")
+
+
+def evaluate(path: Path = EXAMPLES_PATH):
+    data = load_examples(path)
+
+    t0 = time.perf_counter()
+    clf = IntentClassifier().fit(data)
+    fit_ms = (time.perf_counter() - t0) * 1000
+
+    cases = [(label, text) for label, spec in data.items() for text in spec.get("test", [])]
+    correct = 0
+    latencies = []
+    test = Tally()
+    for label, text in cases:
+        t0 = time.perf_counter()
+        pred, slot, score = clf.predict(text)
+        latencies.append(time.perf_counter() - t0)
+        ok = pred == label
+        correct += ok
+        test.add(label, pred)
+        print(f"{'✅' if ok else '❌'} {text!r:<42} -> {pred:<15} {score:.2f}  слот={slot!r}")
+
+    # leave-one-out по обучающим примерам
+    loo_total = loo_correct = 0
+    loo = Tally()
+    for label, spec in data.items():
+        for i, text in enumerate(spec["examples"]):
+            reduced = {k: dict(v) for k, v in data.items()}
+            reduced[label]["examples"] = spec["examples"][:i] + spec["examples"][i + 1:]
+            pred, _, _ = IntentClassifier().fit(reduced).predict(text)
+            loo_total += 1
+            loo_correct += pred == label
+            loo.add(label, pred)
+
+    lat = np.array(latencies) * 1e6
+    print()
+    print(f"Обучение: {fit_ms:.1f} мс")
+    print(f"Тест: {correct}/{len(cases)} ({correct / max(len(cases), 1):.0%})")
+    print(f"Leave-one-out: {loo_correct}/{loo_total} ({loo_correct / max(loo_total, 1):.0%})")
+    print(f"Точность команд (тест): {test.report()}")
+    print(f"Точность команд (leave-one-out): {loo.report()}")
+    print(f"Задержка: медиана {np.median(lat):.0f} мкс, p95 {np.percentile(lat, 95):.0f} мкс")
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    if "--eval" in sys.argv:
+        evaluate()
+    else:
+        clf = load_classifier()
+        for phrase in sys.argv[1:] or ["юко покажи файл отчёт"]:
+            print(phrase, "->", clf.predict(phrase))
@@ -0,0 +1,196 @@
+"""
+Поиск всех ключевых слов за один проход по фразе (автомат Ахо–Корасик)
+Словари из words_config собираются в один автомат с категориями:
+  wake, intent:<ключ>, browser_trigger, alias, launch, junk
+
+    python keyword_engine.py --bench   # сравнение со старым перебором на большом словаре
+"""
+
+import sys
+import time
+from collections import deque, namedtuple
+
+# start/end — позиции в нормализованной фразе, value — доп. данные (для alias — (canonical, порядок))
+Match = namedtuple("Match", "start end word category value")
+
+# глаголы запуска и мусорные слова для extract_app_name
+LAUNCH_WORDS = ["открой", "запусти", "включи"]
+JUNK_WORDS = ["юко", "пожалуйста", "плиз"]
+
+
+def normalize(text: str) -> str:
+    return text.lower().replace("ё", "е")
+
+
+class KeywordEngine:
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        self._patterns: list[tuple[str, str, object]] = []
+        self._built = False
+
+    def add(self, word: str, category: str, value=None):
+        word = normalize(word)
+        if not word:
+            return
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append(len(self._patterns))
+        self._patterns.append((word, category, value))
+        self._built = False
+
+    def build(self):
+        """Суффиксные ссылки (BFS) + слияние выходов, чтобы поиск не ходил по ним"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def find(self, text: str) -> list[Match]:
+        """Все вхождения (в том числе перекрывающиеся) в порядке окончания"""
+        if not self._built:
+            self.build()
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+
+        matches = []
+        node = 0
+        for i, ch in enumerate(normalize(text)):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                word, category, value = patterns[idx]
+                matches.append(Match(i + 1 - len(word), i + 1, word, category, value))
+        return matches
+
+    def categories(self, text: str) -> set[str]:
+        return {m.category for m in self.find(text)}
+
+    def __len__(self):
+        return len(self._patterns)
+
+
+def build_from_config(cfg) -> KeywordEngine:
+    """Автомат по модулю words_config (или любому объекту с теми же полями)"""
+    engine = KeywordEngine()
+    for w in cfg.WAKE_WORDS:
+        engine.add(w, "wake")
+    for key, words in cfg.INTENT_KEYWORDS.items():
+        for w in words:
+            engine.add(w, f"intent:{key}")
+    for w in cfg.BROWSER_TRIGGER_WORDS:
+        engine.add(w, "browser_trigger")
+    # порядок в словаре важен: при нескольких совпадениях побеждает более раннее
+    for rank, (wrong, canonical) in enumerate(cfg.APP_NAME_ALIASES.items()):
+        engine.add(wrong, "alias", (canonical, rank))
+    for rank, w in enumerate(LAUNCH_WORDS):
+        engine.add(w, "launch", rank)
+    for w in JUNK_WORDS:
+        engine.add(w, "junk")
+    return engine.build()
+
+
+def strip_spans(text: str, matches: list[Match]) -> str:
+    """Вырезает найденные слова из фразы (в нижнем регистре) и схлопывает пробелы"""
+    t = text.lower()
+    keep = [True] * len(t)
+    for m in matches:
+        for i in range(m.start, m.end):
+            keep[i] = False
+    return " ".join("".join(ch if k else " " for ch, k in zip(t, keep)).split())
+
+
+# ---------- бенчмарк ----------
+
+def _bench():
+    import random
+
+    import words_config as cfg
+
+    random.seed(0)
+    alphabet = "абвгдежзийклмнопрстуфхцчшщыэюя"
+
+    def rand_word():
+        return "".join(random.choice(alphabet) for _ in range(random.randint(4, 9)))
+
+    # большой словарь: реальные слова + синтетические интенты и алиасы
+    class BigConfig:
+        WAKE_WORDS = list(cfg.WAKE_WORDS)
+        BROWSER_TRIGGER_WORDS = list(cfg.BROWSER_TRIGGER_WORDS)
+        INTENT_KEYWORDS = {k: list(v) for k, v in cfg.INTENT_KEYWORDS.items()}
+        APP_NAME_ALIASES = dict(cfg.APP_NAME_ALIASES)
+
+    for i in range(200):
+        BigConfig.INTENT_KEYWORDS[f"synthetic_{i}"] = [rand_word() for _ in range(20)]
+    for _ in range(2000):
+        BigConfig.APP_NAME_ALIASES[rand_word()] = rand_word()
+
+    phrases = [
+        "юко открой калькулятор пожалуйста",
+        "запусти дискорд",
+        "юко что такое python и зачем он нужен",
+        "найди в интернете рецепт блинов",
+        "юко открой опера gx",
+    ] * 200
+
+    def naive(t):
+        t = normalize(t)
+        found = set()
+        for key, words in BigConfig.INTENT_KEYWORDS.items():
+            if any(w in t for w in words):
+                found.add(key)
+        wake = any(w in t for w in BigConfig.WAKE_WORDS)
+        browser = any(w in t for w in BigConfig.BROWSER_TRIGGER_WORDS)
+        alias = next((c for w, c in BigConfig.APP_NAME_ALIASES.items() if w in t), None)
+        return found, wake, browser, alias
+
+    t0 = time.perf_counter()
+    engine = build_from_config(BigConfig)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for p in phrases:
+        naive(p)
+    naive_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for p in phrases:
+        engine.find(p)
+    engine_s = time.perf_counter() - t0
+
+    n = len(phrases)
+    print(f"Словарь: {len(engine)} слов, сборка автомата {build_s * 1000:.0f} мс")
+    print(f"Перебор:      {naive_s / n * 1e6:8.1f} мкс/фраза")
+    print(f"Ахо–Корасик:  {engine_s / n * 1e6:8.1f} мкс/фраза  (x{naive_s / engine_s:.1f})")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        _bench()
+    else:
+        import words_config
+        engine = build_from_config(words_config)
+        for phrase in sys.argv[1:] or ["юко открой калькулятор"]:
+            for m in engine.find(phrase):
+                print(m)
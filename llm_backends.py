@@ -0,0 +1,244 @@
+"""
+Бэкенды ответов ИИ и предохранитель (circuit breaker) для удалённого
+    RemoteBackend  — Groq или любой OpenAI-совместимый сервер (через llm_client.LLMClient)
+    OfflineBackend — локальные правила, отвечает всегда и мгновенно
+Если сервер N раз подряд не ответил (или ключ неверный), предохранитель размыкается:
+на время паузы удалённый бэкенд не трогаем вовсе и сразу отвечаем офлайн,
+потом пропускаем один пробный запрос. Смена состояния пишется в консоль один раз.
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from streaming_llm import StreamResult, TagStreamParser, stream_completion
+
+
+class BackendUnavailable(Exception):
+    """Удалённый бэкенд сейчас не спрашиваем (нет ключа или предохранитель разомкнут)"""
+
+
+class Backend(ABC):
+    name = "backend"
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def ask(self, request: dict) -> str:
+        """Ответ целиком (с тегами); BackendUnavailable — бэкенд сейчас не отвечает"""
+
+    @abstractmethod
+    def stream(self, request: dict, on_text, on_cmd, begin=None) -> StreamResult:
+        """Ответ по кускам, как streaming_llm.stream_completion"""
+
+
+class RemoteBackend(Backend):
+    def __init__(self, llm):
+        self.llm = llm
+
+    @property
+    def name(self) -> str:
+        return self.llm.name
+
+    def available(self) -> bool:
+        return self.llm.configured
+
+    def ask(self, request: dict) -> str:
+        completion = self.llm.get().chat.completions.create(**request)
+        return (completion.choices[0].message.content or "").strip()
+
+    def stream(self, request: dict, on_text, on_cmd, begin=None) -> StreamResult:
+        return stream_completion(self.llm.get(), on_text, on_cmd, begin=begin, **request)
+
+
+class OfflineBackend(Backend):
+    """confident_only=True — отвечает только по делу, иначе BackendUnavailable (замена опоздавшей сети)"""
+
+    name = "офлайн"
+    UNSURE = "Не совсем поняла запрос, попробуй переформулировать."
+
+    def __init__(self, confident_only: bool = False):
+        self.confident_only = confident_only
+
+    def answer(self, msg: str) -> str:
+        m = msg.lower()
+        if "привет" in m:
+            return "Привет. Чем помочь."
+        if "python" in m:
+            return "Python — язык программирования, на нем удобно писать ассистентов."
+        if any(w in m for w in ["открой браузер", "открой интернет"]):
+            return "Открываю браузер. [OPEN_BROWSER]"
+        return self.UNSURE
+
+    def confident(self, msg: str) -> str | None:
+        """Ответ, только если он по делу (им можно заменить ответ сети)"""
+        answer = self.answer(msg)
+        return None if answer == self.UNSURE else answer
+
+    def ask(self, request: dict) -> str:
+        msg = request["messages"][-1]["content"]
+        if not self.confident_only:
+            return self.answer(msg)
+        answer = self.confident(msg)
+        if answer is None:
+            raise BackendUnavailable(self.name)
+        return answer
+
+    def stream(self, request: dict, on_text, on_cmd, begin=None) -> StreamResult:
+        # ответ готов сразу — один "кусок" через тот же разбор тегов, что и у сети
+        t0 = time.perf_counter()
+        result = StreamResult()
+        result.raw = self.ask(request)
+        if begin is not None and not begin():
+            result.cancelled = True
+            return result
+        parser = TagStreamParser()
+        text, cmds = parser.feed(result.raw)
+        text += parser.flush()
+        if text:
+            result.first_output = time.perf_counter() - t0
+            on_text(text)
+        for ct, p in cmds:
+            if result.first_action is None:
+                result.first_action = time.perf_counter() - t0
+            result.actions.append((ct, p))
+            on_cmd(ct, p)
+        result.text = " ".join(text.split())
+        result.total = time.perf_counter() - t0
+        return result
+
+
+# ---------- предохранитель ----------
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _is_auth_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) in (401, 403)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, max_failures: int = 3, cooldown_s: float = 30.0, auth_cooldown_s: float = 600.0):
+        self.name = name
+        self.max_failures = max_failures
+        self.cooldown_s = cooldown_s
+        self.auth_cooldown_s = auth_cooldown_s
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_for = cooldown_s
+        self._probe_running = False
+        self._lock = threading.Lock()
+
+        self.skipped = 0
+        self.trips = 0
+
+    def _log(self, text: str):
+        print(f"Юко: {text}")
+
+    def available(self) -> bool:
+        """Без побочных эффектов: стоит ли вообще пытаться"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.open_for
+            return not self._probe_running
+
+    def allow(self) -> bool:
+        """Перед запросом; в полуоткрытом состоянии пропускает ровно один пробный запрос"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_for:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_running:
+                self._probe_running = True
+                return True
+            self.skipped += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_running = False
+        if recovered:
+            self._log(f"{self.name} снова отвечает.")
+
+    def failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            first = self.failures == 1
+            was = self.state
+            auth = _is_auth_error(error)
+            trip = auth or was == HALF_OPEN or self.failures >= self.max_failures
+            if trip:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.open_for = self.auth_cooldown_s if auth else self.cooldown_s
+                if was != OPEN:
+                    self.trips += 1
+            self._probe_running = False
+
+        if trip and was == CLOSED:
+            reason = "ключ не подходит" if auth else f"{self.failures} ошибки подряд"
+            self._log(f"{self.name} недоступен ({reason}: {error}). "
+                      f"Отвечаю офлайн, проверю снова через {self.open_for:.0f} с.")
+        elif trip and was == HALF_OPEN:
+            self._log(f"{self.name} всё ещё недоступен, следующая проверка через {self.open_for:.0f} с.")
+        elif first:
+            self._log(f"ошибка при запросе в {self.name}: {error}")
+
+    def report(self) -> str:
+        return (
+            f"Предохранитель {self.name}: состояние {self.state}, срабатываний {self.trips}, "
+            f"запросов пропущено {self.skipped}"
+        )
+
+
+class GuardedBackend(Backend):
+    """Бэкенд за предохранителем: ошибки превращаются в BackendUnavailable, без трейсбеков"""
+
+    def __init__(self, backend: Backend, breaker: CircuitBreaker):
+        self.backend = backend
+        self.breaker = breaker
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def available(self) -> bool:
+        return self.backend.available() and self.breaker.available()
+
+    def _call(self, fn, *args, **kwargs):
+        if not self.backend.available() or not self.breaker.allow():
+            raise BackendUnavailable(self.name)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.breaker.failure(e)
+            raise BackendUnavailable(self.name) from e
+        self.breaker.success()
+        return result
+
+    def ask(self, request: dict) -> str:
+        return self._call(self.backend.ask, request)
+
+    def stream(self, request: dict, on_text, on_cmd, begin=None) -> StreamResult:
+        return self._call(self.backend.stream, request, on_text, on_cmd, begin=begin)
+
+
+def load_remote(llm) -> GuardedBackend:
+    """YUKO_LLM_MAX_FAILURES ошибок подряд -> пауза YUKO_LLM_COOLDOWN секунд"""
+    backend = RemoteBackend(llm)
+    breaker = CircuitBreaker(
+        backend.name,
+        max_failures=int(os.environ.get("YUKO_LLM_MAX_FAILURES", "3")),
+        cooldown_s=float(os.environ.get("YUKO_LLM_COOLDOWN", "30")),
+    )
+    return GuardedBackend(backend, breaker)
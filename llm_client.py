@@ -0,0 +1,234 @@
+"""
+HTTP-клиент LLM: настраиваемый OpenAI-совместимый адрес, живой пул соединений, прогрев и heartbeat
+Первый запрос после старта или паузы не должен платить за DNS + TCP + TLS:
+соединение открывается заранее (prewarm) и поддерживается лёгким запросом /models, пока Юко молчит.
+Для каждого запроса замеряем отдельно время соединения и время сервера.
+
+    YUKO_LLM_BASE_URL=http://127.0.0.1:8080/v1  — свой OpenAI-совместимый сервер (по умолчанию Groq)
+    YUKO_LLM_MODEL=llama-3.3-70b-versatile
+    YUKO_LLM_API_KEY (или GROQ_API_KEY)
+    YUKO_LLM_HEARTBEAT=25                       — секунд простоя до пинга (0 — без пинга)
+
+    python llm_client.py --bench   # холодное / прогретое соединение на локальном сервере-заглушке
+"""
+
+import os
+import sys
+import threading
+import time
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+class RequestTiming:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.connect = 0.0   # TCP + TLS; 0 — соединение взято из пула
+        self.server = 0.0    # от отправки запроса до заголовков ответа
+        self.reused = True
+        self._marks = {}
+
+    def trace(self, event: str, info: dict):
+        # события httpcore: connection.connect_tcp.started, connection.start_tls.complete, ...
+        self._marks[event] = time.perf_counter()
+        if event.startswith("connection.connect_tcp"):
+            self.reused = False
+
+    def finish(self):
+        m = self._marks
+        tcp = m.get("connection.connect_tcp.started")
+        tls = m.get("connection.start_tls.complete") or m.get("connection.connect_tcp.complete")
+        if tcp is not None and tls is not None:
+            self.connect = tls - tcp
+        sent = next((v for k, v in m.items() if k.endswith("send_request_headers.started")), None)
+        got = time.perf_counter()
+        if sent is not None:
+            self.server = got - sent
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: str | None = None,
+        model: str = DEFAULT_MODEL,
+        heartbeat_s: float = 25.0,
+        keepalive_s: float = 120.0,
+        timeout: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.model = model
+        self.heartbeat_s = heartbeat_s
+        self.keepalive_s = keepalive_s
+        self.timeout = timeout
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._heartbeat = None
+        self.last_used = 0.0
+
+        self.timings: list[RequestTiming] = []
+        self.pings = 0
+
+    @property
+    def configured(self) -> bool:
+        # своему серверу ключ обычно не нужен
+        return bool(self.api_key or self.base_url)
+
+    @property
+    def name(self) -> str:
+        return self.base_url or "Groq"
+
+    def get(self):
+        """Groq-клиент поверх общего httpx.Client с keep-alive; None — ключ не задан"""
+        if not self.configured:
+            return None
+        with self._lock:
+            if self._client is None:
+                import httpx
+                from groq import Groq
+
+                http = httpx.Client(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=self.keepalive_s),
+                    event_hooks={"request": [self._on_request], "response": [self._on_response]},
+                )
+                kwargs = {"api_key": self.api_key or "none", "http_client": http}
+                if self.base_url:
+                    kwargs["base_url"] = self.base_url
+                self._client = Groq(**kwargs)
+            return self._client
+
+    # ---------- замеры ----------
+
+    def _on_request(self, request):
+        if self.base_url:
+            # SDK Groq ходит на <base>/openai/v1/..., у OpenAI-совместимых серверов путь <base>/...
+            path = request.url.path.replace("/openai/v1/", "/", 1)
+            request.url = request.url.copy_with(path=path)
+        timing = RequestTiming(request.method, request.url.path)
+        request.extensions["trace"] = timing.trace
+        self._local.timing = timing
+        self.last_used = time.monotonic()
+
+    def _on_response(self, response):
+        timing = getattr(self._local, "timing", None)
+        if timing is None:
+            return
+        self._local.timing = None
+        timing.finish()
+        self.last_used = time.monotonic()
+        if timing.path.endswith("/chat/completions"):
+            self.timings.append(timing)
+
+    @property
+    def last_timing(self) -> RequestTiming | None:
+        return self.timings[-1] if self.timings else None
+
+    # ---------- прогрев и heartbeat ----------
+
+    def ping(self) -> bool:
+        """Лёгкий запрос /models: открывает соединение или не даёт ему остыть"""
+        client = self.get()
+        if client is None:
+            return False
+        try:
+            client.models.list()
+            self.pings += 1
+            return True
+        except Exception:
+            # сервер может не знать /models — соединение всё равно открылось
+            return False
+
+    def prewarm(self) -> threading.Thread:
+        t = threading.Thread(target=self.ping, daemon=True)
+        t.start()
+        return t
+
+    def start_heartbeat(self):
+        if self._heartbeat is not None or self.heartbeat_s <= 0 or not self.configured:
+            return
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_s / 2):
+            if time.monotonic() - self.last_used >= self.heartbeat_s:
+                self.ping()
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=2.0)
+            self._heartbeat = None
+
+    def report(self) -> str:
+        n = len(self.timings)
+        if not n:
+            return f"LLM ({self.name}): запросов не было, пингов {self.pings}"
+        cold = sum(not t.reused for t in self.timings)
+        connect = sum(t.connect for t in self.timings) / n * 1000
+        server = sum(t.server for t in self.timings) / n * 1000
+        return (
+            f"LLM ({self.name}, {self.model}): запросов {n}, новых соединений {cold}, "
+            f"соединение ~{connect:.0f} мс, сервер ~{server:.0f} мс, пингов {self.pings}"
+        )
+
+
+def load_llm_client() -> LLMClient:
+    return LLMClient(
+        api_key=(os.environ.get("YUKO_LLM_API_KEY") or os.environ.get("GROQ_API_KEY") or "").strip(),
+        base_url=os.environ.get("YUKO_LLM_BASE_URL", "").strip() or None,
+        model=os.environ.get("YUKO_LLM_MODEL", "").strip() or DEFAULT_MODEL,
+        heartbeat_s=float(os.environ.get("YUKO_LLM_HEARTBEAT", "25")),
+    )
+
+
+# ---------- замер ----------
+
+def bench(runs: int = 5):
+    from streaming_llm import start_stub_server
+
+    server = start_stub_server(first_token_delay=0.05, token_delay=0.0)
+    host, port = server.server_address
+    request = {"messages": [{"role": "user", "content": "привет"}], "max_tokens": 50}
+
+    def one(llm):
+        llm.get().chat.completions.create(model=llm.model, **request)
+        return llm.last_timing
+
+    # без прогрева: каждый раз новый клиент, соединение открывается внутри запроса
+    cold = [one(LLMClient(base_url=f"http://{host}:{port}/v1", model="stub")) for _ in range(runs)]
+
+    llm = LLMClient(base_url=f"http://{host}:{port}/v1", model="stub")
+    llm.prewarm().join()
+    warm = [one(llm) for _ in range(runs)]
+    server.shutdown()
+
+    print(f"{'':<12}{'соединение':>12}{'сервер':>10}{'новых':>8}")
+    for name, rows in (("холодный", cold), ("прогретый", warm)):
+        connect = sum(t.connect for t in rows) / len(rows) * 1000
+        srv = sum(t.server for t in rows) / len(rows) * 1000
+        print(f"{name:<12}{connect:>9.1f} мс{srv:>7.0f} мс{sum(not t.reused for t in rows):>8}")
+    print("(до локального сервера TLS нет — на настоящем API разница заметно больше)")
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    if "--bench" in sys.argv:
+        bench()
+    else:
+        llm = load_llm_client()
+        print(f"Сервер: {llm.name}, модель {llm.model}, ключ {'есть' if llm.configured else 'нет'}")
+        if llm.configured:
+            t0 = time.perf_counter()
+            ok = llm.ping()
+            print(f"Пинг: {'ok' if ok else 'ошибка'}, {(time.perf_counter() - t0) * 1000:.0f} мс")
@@ -1,31 +1,39 @@
+import time
+
+_T_START = time.perf_counter()  # для --startup-profile: считаем и время импортов
+
 import os
 import sys
+import argparse
+import importlib.metadata
 import subprocess
-import zipfile
+import threading
 from pathlib import Path
 import webbrowser
 import re
 import json
-import traceback
 
-import requests
 from dotenv import load_dotenv  # можно закомментировать, если .env не нужен
 
-from file_actions import search_file, open_file, show_in_explorer, delete_file
-from words_config import (
-    CORRECTIONS,
-    BROWSER_TRIGGER_WORDS,
-    WAKE_WORDS,
-    INTENT_KEYWORDS,
-    APP_NAME_ALIASES,
-)
-from app_launcher import launch_app, list_registered_apps
-
-import sounddevice as sd
-import numpy as np
-from faster_whisper import WhisperModel
-
-from groq import Groq
+from file_actions import iter_search_file, open_file, show_in_explorer, delete_file
+from file_index import get_file_index, start_file_index
+from recent_files import RecentFiles, is_temp, root_key, start_recent_files
+import words_config
+from words_config import WAKE_WORDS
+from phrase_analysis import PhraseAnalyzer
+from app_launcher import launch_app, rebuild_app_index, resolve_app_name
+from config_service import load_module, read_json, service as config_service
+from audio_stream import AudioCapture, SAMPLE_RATE
+from vad_gate import SpeechGate
+from asr_profiles import load_profile, make_decoder, model_kwargs, transcribe_kwargs
+from response_cache import load_cache, prompt_version
+from hedged_ai import load_hedger
+from llm_client import load_llm_client
+from conversation_memory import load_memory
+from llm_backends import BackendUnavailable, OfflineBackend, load_remote
+from command_registry import CommandRegistry, PromptQueue
+
+# sounddevice, faster_whisper и groq тяжёлые — импортируются лениво, там где нужны
 
 
 # ---------- базовая настройка ----------
@@ -42,13 +50,41 @@ MODELS_DIR = DATA_DIR / "models"
 TEMP_DIR = DATA_DIR / "temp"
 BROWSERS_CFG_PATH = BASE_DIR / "browsers.json"
 
-for d in (DATA_DIR, MODELS_DIR, TEMP_DIR):
-    d.mkdir(exist_ok=True)
 
-print("Юко AI запущена. Скажи 'выход', чтобы завершить.\n")
+# ---------- профиль запуска ----------
+
+class StartupProfile:
+    """Разбивка времени до первого прослушивания по фазам"""
+
+    def __init__(self, t0: float):
+        self.t0 = t0
+        self.last = t0
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def add(self, name: str, seconds: float):
+        """Фаза, которая шла параллельно (в фоновом потоке)"""
+        self.phases.append((name, seconds))
+
+    def report(self) -> str:
+        lines = ["⏱  Профиль запуска:"]
+        for name, sec in self.phases:
+            lines.append(f"  {name:<34} {sec * 1000:8.0f} мс")
+        total = time.perf_counter() - self.t0
+        lines.append(f"  {'до первого прослушивания':<34} {total * 1000:8.0f} мс")
+        return "\n".join(lines)
+
 
 # ---------- установка пакетов ----------
 
+# имя дистрибутива pip -> проверяем через importlib.metadata, без подпроцессов
+REQUIRED_PACKAGES = ("sounddevice", "numpy", "faster-whisper", "groq", "send2trash")
+
+
 def install_package(pkg: str):
     subprocess.check_call(
         [sys.executable, "-m", "pip", "install", pkg, "-q"],
@@ -56,57 +92,152 @@ def install_package(pkg: str):
         stderr=subprocess.DEVNULL,
     )
 
-for m in ("sounddevice", "numpy", "faster-whisper", "groq", "send2trash"):
+
+def ensure_packages():
+    for pkg in REQUIRED_PACKAGES:
+        try:
+            importlib.metadata.version(pkg)
+        except importlib.metadata.PackageNotFoundError:
+            print(f"Юко: ставлю недостающий пакет {pkg}...")
+            install_package(pkg)
+
+
+# ---------- звук ----------
+
+speech_gate: SpeechGate | None = None
+capture: AudioCapture | None = None
+
+
+def open_audio():
+    global speech_gate, capture
+
     try:
-        __import__(m)
-    except ImportError:
-        install_package(m)
+        import sounddevice as sd
+        sd.query_devices()
+    except Exception as e:
+        print("Ошибка доступа к устройствам звука:", e)
 
-# ---------- проверка звука ----------
+    # непрерывная запись: микрофон пишется всегда, фразы режутся по паузам.
+    # SpeechGate калибрует уровень шума по первой секунде — в это время лучше молчать
+    speech_gate = SpeechGate()
+    capture = AudioCapture(gate=speech_gate)
 
-try:
-    _devices = sd.query_devices()
-except Exception as e:
-    print("Ошибка доступа к устройствам звука:", e)
+    try:
+        capture.start()
+    except Exception as e:
+        print("Ошибка записи с микрофона:", e)
 
 
 # ---------- Whisper модель ----------
 
-# small — компромисс по качеству и скорости; device="cpu" если без GPU
-whisper_model = WhisperModel("small", device="cpu", compute_type="int8")
+# YUKO_WAKE_MODE=1 — режим "всегда слушаю": постоянно крутится только tiny-детектор
+# wake-слова, а small загружается и запускается лишь для фразы после "юко"
+WAKE_MODE = os.environ.get("YUKO_WAKE_MODE", "").strip() in ("1", "true", "yes")
+WAKE_ARM_SECONDS = 8.0       # сколько ждать команду после одиночного "юко"
+WAKE_ONLY_SECONDS = 1.2      # фраза короче — считаем, что сказали только wake-слово
+
+# профиль ASR: YUKO_ASR_PROFILE=latency|balanced|accuracy или подобранный через --tune-asr
+asr_profile = load_profile()
+adaptive_decoder = make_decoder(asr_profile)
+
+whisper_model = None
+wake_detector = None
+_wake_armed_until = 0.0
+_model_lock = threading.Lock()
+model_load_time = 0.0
+
+
+def get_whisper_model():
+    global whisper_model, model_load_time
+    # если модель грузится в фоне — ждём её здесь
+    with _model_lock:
+        if whisper_model is None:
+            t0 = time.perf_counter()
+            from faster_whisper import WhisperModel
+            whisper_model = WhisperModel(**model_kwargs(asr_profile))
+            model_load_time = time.perf_counter() - t0
+    return whisper_model
+
+
+def load_models():
+    global wake_detector, model_load_time
+    if WAKE_MODE:
+        t0 = time.perf_counter()
+        from wake_word import WakeWordDetector
+        wake_detector = WakeWordDetector(WAKE_WORDS)
+        model_load_time = time.perf_counter() - t0
+    else:
+        get_whisper_model()
+
+
+def start_model_loading() -> threading.Thread:
+    """Модели грузятся в фоне, пока открывается микрофон"""
+    thread = threading.Thread(target=load_models, daemon=True)
+    thread.start()
+    return thread
+
+
+# YUKO_STREAMING=1 — частичные расшифровки: локальные команды (калькулятор, стим, ...)
+# запускаются, как только их стало однозначно слышно, не дожидаясь конца фразы
+STREAMING_MODE = os.environ.get("YUKO_STREAMING", "").strip() in ("1", "true", "yes")
+EARLY_INTENTS = ("calc", "notepad", "browser", "youtube", "discord", "telegram", "steam")
+
+asr_calls = 0
+asr_time = 0.0
+early_dispatches: dict[int, float] = {}
+# проверка "фраза ещё идёт" + запись в early_dispatches (поток ASR) и pop в listen() — под одним замком:
+# capture сбрасывает текущую фразу до того, как отдать её в очередь, так что фраза либо уже
+# помечена к моменту pop, либо on_partial увидит, что она закончилась
+early_lock = threading.Lock()
+
+# YUKO_RECORD_SESSION=1 — сохранять распознанные фразы в yuko_data/temp для разбора ошибок
+# (размер кольцевого файла — YUKO_RECORD_MINUTES минут, по умолчанию 10)
+RECORD_SESSION = os.environ.get("YUKO_RECORD_SESSION", "").strip() in ("1", "true", "yes")
+recorder = None
+last_samples = None
 
 
 # ---------- Groq ----------
 
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "").strip()
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# YUKO_LLM_STREAM=0 — ждать ответ Groq целиком (по умолчанию текст печатается по мере генерации,
+# а теги выполняются сразу, не дожидаясь конца ответа)
+LLM_STREAM = os.environ.get("YUKO_LLM_STREAM", "1").strip() not in ("0", "false", "no")
+llm_stats = []
+
+# YUKO_LLM_BUDGET — сколько секунд ждать сеть, прежде чем ответить офлайн или сказать "думаю…"
+hedger = load_hedger()
+
+# адрес и модель настраиваются (YUKO_LLM_BASE_URL, YUKO_LLM_MODEL), соединение держится открытым
+llm = load_llm_client()
+# удалённый бэкенд за предохранителем: если сервер лежит, сразу отвечаем офлайн
+remote = load_remote(llm)
+offline = OfflineBackend()
+# только уверенные офлайн-ответы — ими можно заменить опоздавшую сеть
+offline_sure = OfflineBackend(confident_only=True)
 
 
 # ---------- конфиг браузеров ----------
 
+# browsers.json в памяти; перечитывается сервисом конфигов при изменении файла
+browsers_file = config_service.watch("browsers", BROWSERS_CFG_PATH, read_json)
+
 def load_browsers_cfg() -> dict:
-    if BROWSERS_CFG_PATH.is_file():
-        try:
-            with open(BROWSERS_CFG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    return dict(browsers_file.get())
 
 def save_browsers_cfg(cfg: dict):
     with open(BROWSERS_CFG_PATH, "w", encoding="utf-8") as f:
         json.dump(cfg, f, ensure_ascii=False, indent=2)
-
-BROWSERS_CFG = load_browsers_cfg()
+    browsers_file.replace(dict(cfg))
 
 def get_browser_path(name: str) -> str | None:
     name = name.lower()
-    return BROWSERS_CFG.get(name)
+    return browsers_file.get().get(name)
 
 def register_browser(name: str, path: str):
     name = name.lower()
-    BROWSERS_CFG[name] = path
-    save_browsers_cfg(BROWSERS_CFG)
+    cfg = load_browsers_cfg()
+    cfg[name] = path
+    save_browsers_cfg(cfg)
 
 def open_default_browser(url: str | None = None):
     try:
@@ -120,120 +251,317 @@ def open_default_browser(url: str | None = None):
 
 # ---------- постобработка фразы / имена приложений ----------
 
-def normalize_app_name(name: str) -> str:
-    name = name.strip().lower()
-    for wrong, canonical in APP_NAME_ALIASES.items():
-        if wrong in name:
-            return canonical
-    return name
+# автомат ключевых слов + корректор; тот же разбор использует batch_transcribe.py
+phrases = PhraseAnalyzer(words_config)
 
-def extract_app_name(text: str) -> str | None:
-    """
-    Пытается вытащить имя приложения из фразы:
-      'юко открой дискорд' -> 'дискорд'
-      'запусти steam'      -> 'steam'
-    """
-    t = text.lower()
-    for trigger in ["открой", "запусти", "включи"]:
-        if trigger in t:
-            part = t.split(trigger, 1)[1].strip()
-            for junk in ["юко", "пожалуйста", "плиз"]:
-                part = part.replace(junk, " ")
-            part = " ".join(part.split())
-            return part or None
-    return None
+
+def on_words_reload(cfg):
+    """words_config.py изменился: собираем новые индексы и подменяем глобальную ссылку"""
+    global phrases
+    new_phrases = PhraseAnalyzer(cfg)
+    rebuild_app_index(aliases=cfg.APP_NAME_ALIASES)
+    phrases = new_phrases
+
+
+config_service.watch(
+    "words",
+    Path(words_config.__file__),
+    load_module,
+    on_reload=on_words_reload,
+    initial=words_config,
+)
+
+# локальный классификатор: "покажи файл отчёт" -> [SEARCH_FILE:отчёт] без похода в LLM;
+# numpy и обучение — в фоне, чтобы не тормозить запуск; пока не готов, фразы идут в LLM
+classifier = None
+
+
+def load_classifier_bg():
+    global classifier
+    from intent_classifier import load_classifier
+    classifier = load_classifier()
+
+
+def start_classifier_loading() -> threading.Thread:
+    thread = threading.Thread(target=load_classifier_bg, daemon=True)
+    thread.start()
+    return thread
+
+LOCAL_TAG_REPLIES = {
+    "SEARCH_FILE": "Ищу файл {}.",
+    "WEB_SEARCH": "Ищу в интернете: {}.",
+    "YOUTUBE_SEARCH": "Ищу на YouTube: {}.",
+}
+
+
+def normalize_app_name(name: str) -> str:
+    # индекс имён из app_launcher: алиасы, транслит и нечёткое совпадение
+    return resolve_app_name(name)
 
 
 # ---------- распознавание речи (Whisper) ----------
 
 def listen() -> str:
-    # длина записи, можно подстроить (2.0–4.0)
-    duration = 5.0
+    if not capture.running:
+        try:
+            capture.start()
+        except Exception as e:
+            print("Ошибка записи с микрофона:", e)
+            time.sleep(1.0)
+            return ""
+
+    # ждём конца очередной фразы; запись в это время продолжается
+    samples = capture.next_utterance(timeout=1.0)
+    if samples is None:
+        return ""
 
-    try:
-        audio = sd.rec(int(duration * 16000), samplerate=16000, channels=1, dtype="float32")
-        sd.wait()
-    except Exception as e:
-        print("Ошибка записи с микрофона:", e)
+    start, end_time = capture.last_info
+    with early_lock:
+        dispatched_at = early_dispatches.pop(start, None)
+    if dispatched_at is not None:
+        # команду уже выполнили по частичной расшифровке; выигрыш = остаток фразы + полная расшифровка
+        avg_asr = asr_time / asr_calls if asr_calls else 0.0
+        saved = end_time - dispatched_at + avg_asr
+        print(f"⚡ Команда выполнена раньше на {saved * 1000:.0f} мс")
+        return ""
+
+    # тишину и шум в Whisper не отдаём
+    if not speech_gate.accept(samples):
         return ""
 
-    samples = audio.flatten()
+    if WAKE_MODE and not wake_gate(samples):
+        return ""
+
+    global last_samples
+    last_samples = samples
+    return transcribe(samples)
+
+
+def wake_gate(samples) -> bool:
+    """Пропускает к большой модели только фразы с wake-словом или сразу после него"""
+    global _wake_armed_until
 
+    if time.monotonic() < _wake_armed_until:
+        _wake_armed_until = 0.0
+        return True
+
+    if not wake_detector.detect(samples):
+        return False
+
+    if len(samples) < WAKE_ONLY_SECONDS * SAMPLE_RATE:
+        # сказали только "юко" — ждём команду следующей фразой
+        _wake_armed_until = time.monotonic() + WAKE_ARM_SECONDS
+        print("Юко: слушаю.")
+        return False
+    return True
+
+
+def transcribe(samples) -> str:
+    global asr_calls, asr_time
+    t0 = time.perf_counter()
     try:
-        segments, info = whisper_model.transcribe(
-            samples,
-            language="ru",
-            beam_size=5,
-            vad_filter=True,
-            vad_parameters=dict(
-                min_silence_duration_ms=500,
-            ),
-        )
+        if adaptive_decoder:
+            text = adaptive_decoder.transcribe(
+                get_whisper_model(),
+                samples,
+                **transcribe_kwargs(asr_profile),
+            )
+        else:
+            segments, info = get_whisper_model().transcribe(
+                samples,
+                **transcribe_kwargs(asr_profile),
+            )
+            text = " ".join(seg.text for seg in segments)
     except Exception as e:
         print("Ошибка распознавания Whisper:", e)
         return ""
 
-    text_parts = []
-    for seg in segments:
-        text_parts.append(seg.text)
-
-    text = " ".join(text_parts).strip().lower()
+    text = text.strip().lower()
+    asr_calls += 1
+    asr_time += time.perf_counter() - t0
     return text
 
 
+def on_partial(start: int, text: str) -> bool:
+    """Частичная расшифровка: запускаем локальную команду, если интент уже однозначен"""
+    text, _ = phrases.corrector.correct(text)
+    intent = phrases.analyze(text)
+    if intent not in EARLY_INTENTS:
+        return False
+    with early_lock:
+        current = capture.current_speech()
+        if current is None or current[0] != start:
+            # фраза уже закончилась и ушла в обычную расшифровку
+            return False
+        # резервируем до запуска команды: listen() уже не отдаст эту фразу в Whisper
+        early_dispatches[start] = time.monotonic()
+    print("🎧 Распознано (частично):", text)
+    run_local_intent(intent)
+    return True
+
+
 # ---------- Groq / офлайн-ответ ----------
 
-def ask_groq(msg: str) -> str | None:
-    if not client:
-        print("Юко: ключ GROQ_API_KEY не задан, работаю офлайн.")
+SYSTEM_PROMPT = (
+    "You are Yuko, a helpful AI assistant. "
+    "You are a female. "
+    "Answer briefly in Russian, 2-4 sentences. "
+    "You may sometimes control the PC using tags, BUT ONLY when the user явно просит выполнить действие.\n"
+    "Rules for tags:\n"
+    "1) Use [OPEN_BROWSER] or [OPEN_BROWSER_URL:url] ONLY if the request clearly asks to open a browser "
+    "or a website (e.g. \"открой браузер\", \"открой интернет\", \"зайди на сайт\", \"найди в интернете ...\").\n"
+    "2) Never open the browser if the user just asks a question (weather, study, programming, etc.). "
+    "In such cases respond with pure text only, without any tags.\n"
+    "3) For file operations use [SEARCH_FILE:query], [OPEN_FILE:path], [SHOW_IN_EXPLORER:path], "
+    "[DELETE_FILE:path] only if the user explicitly asks to find/open/delete a file.\n"
+    "4) If the user says phrases like \"найди в интернете ...\", \"найди рецепт ...\", "
+    "you SHOULD use [WEB_SEARCH:запрос] tag.\n"
+    "5) If the user asks to open YouTube (\"открой ютуб\", \"открой youtube\"), "
+    "use [OPEN_BROWSER_URL:https://www.youtube.com].\n"
+    "6) For the newest files in a folder (\"последний скачанный файл\", \"что я недавно сохранял на рабочий стол\") "
+    "use [RECENT_FILES:folder|N] to list them or [OPEN_RECENT:folder] to open the newest one; "
+    "folder is downloads, desktop, documents, pictures or videos, empty means all folders.\n"
+    "7) Never invent tags without necessity. If no tag is clearly needed, answer with text only."
+    "Your creator has name Finn. "
+)
+
+
+PROMPT_VERSION = prompt_version(SYSTEM_PROMPT)
+
+# одинаковые вопросы без тегов отвечаем из кэша (yuko_data/response_cache.json)
+response_cache = load_cache(DATA_DIR / "response_cache.json")
+
+
+# последние реплики для уточняющих вопросов ("а подробнее?"), в пределах YUKO_MEMORY_TOKENS
+memory = load_memory()
+
+
+def in_conversation() -> bool:
+    return memory is not None and memory.has_context()
+
+
+def cached_answer(msg: str) -> str | None:
+    # посреди разговора тот же вопрос может значить другое — кэш только для первого вопроса
+    if response_cache is None or in_conversation():
+        return None
+    answer = response_cache.get(msg, PROMPT_VERSION, llm.model)
+    if answer is not None and memory is not None:
+        memory.add(msg, answer)
+    return answer
+
+
+def remember_answer(msg: str, answer: str, elapsed: float):
+    if response_cache is not None and not in_conversation():
+        response_cache.put(msg, PROMPT_VERSION, llm.model, answer, elapsed)
+    if memory is not None:
+        # в историю — без тегов, чтобы модель не повторяла действия
+        memory.add(msg, parse_commands(answer)[0])
+
+
+def groq_request(msg: str) -> dict:
+    if memory is not None:
+        messages = memory.messages(SYSTEM_PROMPT, msg)
+    else:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": msg},
+        ]
+    request = {
+        "model": llm.model,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": 300,
+    }
+    if hedger is not None:
+        # дольше бюджета ответ всё равно никто не ждёт — не держим соединение
+        request["timeout"] = hedger.request_timeout
+    return request
+
+
+def ask_groq(msg: str, call=None) -> str | None:
+    """call — HedgedCall: опоздавший ответ (call отменён) не попадает ни в память, ни в кэш"""
+    cached = cached_answer(msg)
+    if cached is not None:
+        return cached
+    if not remote.available():
         return None
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are Yuko, a helpful AI assistant. "
-                        "You are a female. "
-                        "Answer briefly in Russian, 2-4 sentences. "
-                        "You may sometimes control the PC using tags, BUT ONLY when the user явно просит выполнить действие.\n"
-                        "Rules for tags:\n"
-                        "1) Use [OPEN_BROWSER] or [OPEN_BROWSER_URL:url] ONLY if the request clearly asks to open a browser "
-                        "or a website (e.g. \"открой браузер\", \"открой интернет\", \"зайди на сайт\", \"найди в интернете ...\").\n"
-                        "2) Never open the browser if the user just asks a question (weather, study, programming, etc.). "
-                        "In such cases respond with pure text only, without any tags.\n"
-                        "3) For file operations use [SEARCH_FILE:query], [OPEN_FILE:path], [SHOW_IN_EXPLORER:path], "
-                        "[DELETE_FILE:path] only if the user explicitly asks to find/open/delete a file.\n"
-                        "4) If the user says phrases like \"найди в интернете ...\", \"найди рецепт ...\", "
-                        "you SHOULD use [WEB_SEARCH:запрос] tag.\n"
-                        "5) If the user asks to open YouTube (\"открой ютуб\", \"открой youtube\"), "
-                        "use [OPEN_BROWSER_URL:https://www.youtube.com].\n"
-                        "6) Never invent tags without necessity. If no tag is clearly needed, answer with text only."
-                        "Your creator has name Finn. "
-                    ),
-                },
-                {"role": "user", "content": msg},
-            ],
-            temperature=0.7,
-            max_tokens=300,
-        )
-        answer = completion.choices[0].message.content.strip()
-        return answer
-    except Exception:
-        print("Юко: ошибка при запросе в Groq:")
-        traceback.print_exc()
+        t0 = time.perf_counter()
+        answer = remote.ask(groq_request(msg))
+    except BackendUnavailable:
+        return None
+    # begin() атомарно: либо ответ ещё ждут (и отменить его уже нельзя), либо он никому не нужен
+    if call is not None and not call.begin():
+        return None
+    remember_answer(msg, answer, time.perf_counter() - t0)
+    return answer
+
+def ask_groq_stream(msg: str, on_cmd, call=None) -> str | None:
+    """
+    Ответ печатается по мере генерации, теги выполняются сразу после своей ']'.
+    None — ничего не успели показать (нет ключа, ошибка сразу или ответ отменён), можно отвечать офлайн.
+    call — HedgedCall, если ответ ждут с бюджетом по времени: без call.begin() выводить нельзя.
+    """
+    begin = call.begin if call is not None else None
+
+    cached = cached_answer(msg)
+    if cached is not None:
+        if begin is not None and not begin():
+            return None
+        print("Юко:", cached)
+        return cached
+
+    if not remote.available():
         return None
 
+    started = False
+
+    def on_text(text):
+        nonlocal started
+        if not started:
+            text = text.lstrip()
+            if not text:
+                return
+            print("Юко: ", end="", flush=True)
+            started = True
+        print(text, end="", flush=True)
+
+    try:
+        result = remote.stream(groq_request(msg), on_text, on_cmd, begin=begin)
+    except BackendUnavailable:
+        if started:
+            print()
+        return "" if started else None
+    if started:
+        print()
+    if result.cancelled:
+        return None
+    llm_stats.append((result.first_output, result.first_action, result.total))
+    remember_answer(msg, result.raw.strip(), result.total)
+    return result.text
+
+def llm_report() -> str:
+    def avg(k):
+        vals = [r[k] for r in llm_stats if r[k] is not None]
+        return f"{sum(vals) / len(vals) * 1000:.0f} мс" if vals else "—"
+    return (
+        f"LLM (поток): ответов {len(llm_stats)}, первый текст {avg(0)}, "
+        f"первое действие {avg(1)}, весь ответ {avg(2)}"
+    )
+
+def offline_request(msg: str) -> dict:
+    # правилам офлайна история не нужна — только сама фраза
+    return {"messages": [{"role": "user", "content": msg}]}
+
 def ask_offline(msg: str) -> str:
-    m = msg.lower()
-    if "привет" in m:
-        return "Привет. Чем помочь."
-    if "python" in m:
-        return "Python — язык программирования, на нем удобно писать ассистентов."
-    if any(w in m for w in ["открой браузер", "открой интернет"]):
-        return "Открываю браузер. [OPEN_BROWSER]"
-    return "Не совсем поняла запрос, попробуй переформулировать."
+    return offline.ask(offline_request(msg))
+
+def offline_answer(msg: str) -> str | None:
+    """Офлайн-ответ, только если он по делу (им можно заменить опоздавший ответ сети)"""
+    try:
+        return offline_sure.ask(offline_request(msg))
+    except BackendUnavailable:
+        return None
 
 def ask_ai(msg: str) -> str:
     resp = ask_groq(msg)
@@ -259,215 +587,422 @@ def parse_commands(text: str):
 
 last_user_phrase = ""
 
-def execute_cmd(cmd_type: str, param: str, context_phrase: str = ""):
-    global last_user_phrase
-    ct = cmd_type.lower()
-    p = param.strip()
-    try:
-        if ct in ("open_browser", "open_browser_url", "open_browser_named"):
-            t = (context_phrase or last_user_phrase).lower()
-            if not any(w in t for w in BROWSER_TRIGGER_WORDS):
-                return
+# команды выполняются в фоне — микрофон в это время продолжает слушать
+commands = CommandRegistry(workers=3)
+# уточняющие вопросы команд: ответ — следующей фразой или строкой в консоли
+prompts = PromptQueue()
+
+
+def ask_path(question: str) -> str | None:
+    answer = prompts.ask(question, timeout_s=60.0, validate=os.path.isfile)
+    return answer.strip('" ').strip() if answer else None
 
-        if ct == "run_program":
-            programs = {
-                "calc": "calc",
-                "калькулятор": "calc",
-                "notepad": "notepad",
-                "блокнот": "notepad",
-            }
-            prog = programs.get(p.lower(), p)
-            subprocess.Popen(prog, shell=True)
-
-        elif ct == "open_browser":
-            open_default_browser()
-
-        elif ct == "open_browser_url":
-            url = p.strip()
-            open_default_browser(url if url else None)
-
-        elif ct == "open_browser_named":
-            parts = p.split("|", 1)
-            name = parts[0].strip().lower()
-            url = parts[1].strip() if len(parts) == 2 else None
-
-            path = get_browser_path(name)
-            if not path:
-                print(f"Юко: я не знаю, где установлен браузер '{name}'.")
-                print("Перетащи сюда его .exe или введи полный путь.")
-                user_path = input("Путь к браузеру: ").strip('" ').strip()
-
-                if not user_path or not os.path.isfile(user_path):
-                    print("Юко: путь некорректный, открываю браузер по умолчанию.")
-                    open_default_browser(url)
-                    return
-
-                register_browser(name, user_path)
-                path = user_path
-                print(f"Юко: запомнила браузер '{name}'.")
-
-            cmd = f'"{path}"'
-            if url:
-                cmd += f' "{url}"'
-            subprocess.Popen(cmd)
-
-        elif ct == "search_file":
-            if not p:
-                print("Юко: что искать?")
-                return
-            results = search_file(p)
-            if not results:
-                print("Юко: ничего не нашла.")
-            else:
-                print("Юко: нашла файлы:")
-                for i, path in enumerate(results, 1):
-                    print(f"{i}. {path}")
 
-        elif ct == "open_file":
-            open_file(p)
+@commands.command("run_program")
+def cmd_run_program(p: str, context_phrase: str):
+    programs = {
+        "calc": "calc",
+        "калькулятор": "calc",
+        "notepad": "notepad",
+        "блокнот": "notepad",
+    }
+    prog = programs.get(p.lower(), p)
+    subprocess.Popen(prog, shell=True)
+
+
+@commands.command("open_browser")
+def cmd_open_browser(p: str, context_phrase: str):
+    open_default_browser()
+
+
+@commands.command("open_browser_url")
+def cmd_open_browser_url(p: str, context_phrase: str):
+    open_default_browser(p if p else None)
+
+
+@commands.command("open_browser_named")
+def cmd_open_browser_named(p: str, context_phrase: str):
+    parts = p.split("|", 1)
+    name = parts[0].strip().lower()
+    url = parts[1].strip() if len(parts) == 2 else None
+
+    path = get_browser_path(name)
+    if not path:
+        print(f"Юко: я не знаю, где установлен браузер '{name}'.")
+        print("Перетащи сюда его .exe или введи полный путь.")
+        user_path = ask_path("Путь к браузеру?")
+
+        if not user_path:
+            print("Юко: путь некорректный, открываю браузер по умолчанию.")
+            open_default_browser(url)
+            return "браузер по умолчанию"
+
+        register_browser(name, user_path)
+        path = user_path
+        print(f"Юко: запомнила браузер '{name}'.")
 
-        elif ct == "show_in_explorer":
-            show_in_explorer(p)
+    cmd = f'"{path}"'
+    if url:
+        cmd += f' "{url}"'
+    subprocess.Popen(cmd)
 
-        elif ct == "delete_file":
-            delete_file(p)
-            print("Юко: отправила файл в корзину.")
 
-        elif ct == "youtube_search":
-            if p:
-                webbrowser.open(f"https://www.youtube.com/results?search_query={p}")
+SEARCH_DEADLINE = 15.0
+# при выходе обрывает обход папок, который ещё идёт в фоне
+search_cancel = threading.Event()
 
-        elif ct == "web_search":
-            if p:
-                webbrowser.open(f"https://yandex.ru/search/?text={p}")
 
-    except PermissionError:
-        print("Юко: в системные файлы я не лезу, это опасно.")
-    except FileNotFoundError:
-        print("Юко: файл или папка не найдены.")
-    except Exception as e:
-        print(f"Юко: ошибка при выполнении команды {ct}: {e}")
+@commands.command("search_file")
+def cmd_search_file(p: str, context_phrase: str):
+    if not p:
+        print("Юко: что искать?")
+        return "пустой запрос"
+    # печатаем по мере нахождения; без индекса ищем не дольше SEARCH_DEADLINE секунд
+    found = 0
+    for found, path in enumerate(iter_search_file(p, deadline_s=SEARCH_DEADLINE, cancel=search_cancel), 1):
+        if found == 1:
+            print("Юко: нашла файлы:")
+        print(f"{found}. {path}")
+    if not found:
+        print("Юко: ничего не нашла.")
+    return f"найдено {found}"
 
 
-# ---------- анализ намерения ----------
+# живой список недавних файлов (см. recent_files.py); None — сервис выключен (по умолчанию)
+recent_files = None
 
-def analyze(text: str) -> str:
-    t = text.lower().replace("ё", "е")
 
-    def has(key):
-        return any(w in t for w in INTENT_KEYWORDS.get(key, []))
+def latest_files(root: str, n: int, ext: str | None = None):
+    if recent_files is not None:
+        return recent_files.latest(root, n, ext)
+    from file_actions import ALLOWED_ROOTS, get_policy
+    roots = [r for r in ALLOWED_ROOTS if not root or Path(r).name.lower() == root_key(root)]
+    # без сервиса — по mtime из индекса файлов, а пока он не собран — разовый обход папок
+    index = get_file_index()
+    if index is not None and index.ready:
+        return index.latest(roots, n, ext, skip=is_temp)
+    once = RecentFiles(roots, get_policy().check_resolved)
+    once.seed()
+    return once.latest(root, n, ext)
 
-    if has("exit"):
-        return "exit"
-    if has("thanks"):
-        return "thanks"
 
-    if any(w in t for w in ["открой", "запусти", "включи"]):
-        if has("calc"):
-            return "calc"
-        if has("notepad"):
-            return "notepad"
-        if has("browser"):
-            return "browser"
-        if has("youtube"):
-            return "youtube"
-        if has("discord"):
-            return "discord"
-        if has("telegram"):
-            return "telegram"
-        if has("steam"):
-            return "steam"
-        # общее приложение
-        return "app"
+def parse_recent_param(p: str):
+    """'downloads|5|pdf' -> ('downloads', 5, 'pdf')"""
+    parts = [x.strip() for x in p.split("|")]
+    root = parts[0] if parts else ""
+    n = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 5
+    ext = parts[2] if len(parts) > 2 and parts[2] else None
+    return root, max(1, min(n, 20)), ext
 
-    return "ai"
 
+@commands.command("recent_files")
+def cmd_recent_files(p: str, context_phrase: str):
+    root, n, ext = parse_recent_param(p)
+    found = latest_files(root, n, ext)
+    if not found:
+        print("Юко: недавних файлов не нашла.")
+        return "найдено 0"
+    print("Юко: последние файлы:")
+    for i, path in enumerate(found, 1):
+        print(f"{i}. {path}")
+    return f"найдено {len(found)}"
 
-def has_wake_word(text: str) -> bool:
-    t = text.lower()
-    return any(w in t for w in WAKE_WORDS)
 
+@commands.command("open_recent")
+def cmd_open_recent(p: str, context_phrase: str):
+    root, _, ext = parse_recent_param(p)
+    found = latest_files(root, 1, ext)
+    if not found:
+        print("Юко: недавних файлов не нашла.")
+        return "не найдено"
+    print(f"Юко: открываю {found[0].name}")
+    open_file(str(found[0]))
+
+
+@commands.command("open_file")
+def cmd_open_file(p: str, context_phrase: str):
+    open_file(p)
+
+
+@commands.command("show_in_explorer")
+def cmd_show_in_explorer(p: str, context_phrase: str):
+    show_in_explorer(p)
+
+
+@commands.command("delete_file")
+def cmd_delete_file(p: str, context_phrase: str):
+    delete_file(p)
+    print("Юко: отправила файл в корзину.")
+
+
+@commands.command("youtube_search")
+def cmd_youtube_search(p: str, context_phrase: str):
+    if p:
+        webbrowser.open(f"https://www.youtube.com/results?search_query={p}")
 
-# ---------- главный цикл ----------
 
-while True:
-    phrase = listen()
-    if not phrase:
-        continue
+@commands.command("web_search")
+def cmd_web_search(p: str, context_phrase: str):
+    if p:
+        webbrowser.open(f"https://yandex.ru/search/?text={p}")
 
-    phrase = phrase.strip().lower()
-    last_user_phrase = phrase
 
-    print("🎧 Распознано:", phrase)
+@commands.command("launch_app")
+def cmd_launch_app(p: str, context_phrase: str):
+    return "запущено" if launch_app(p, ask=ask_path) else "не запущено"
 
-    intent = analyze(phrase)
-    wake = has_wake_word(phrase)
 
-    if intent == "exit":
-        print("Юко: Пока 👋")
-        break
+def execute_cmd(cmd_type: str, param: str, context_phrase: str = ""):
+    """Ставит команду в очередь и сразу возвращается"""
+    ct = cmd_type.lower()
+    if ct in ("open_browser", "open_browser_url", "open_browser_named"):
+        t = context_phrase or last_user_phrase
+        if not phrases.has_browser_trigger(t):
+            return
+    commands.dispatch(ct, param, context_phrase)
 
-    if intent == "thanks":
-        print("Юко: Пожалуйста 💜")
-        continue
 
+# ---------- анализ намерения ----------
+
+def run_local_intent(intent: str) -> bool:
+    """Локальные команды без ИИ; True — если интент обработан"""
     if intent == "calc":
         print("Юко: Открываю калькулятор.")
         subprocess.Popen("calc", shell=True)
-        continue
+        return True
 
     if intent == "notepad":
         print("Юко: Открываю блокнот.")
         subprocess.Popen("notepad", shell=True)
-        continue
+        return True
 
     if intent == "browser":
         print("Юко: Открываю браузер.")
         open_default_browser()
-        continue
+        return True
 
     if intent == "youtube":
         print("Юко: Открываю YouTube.")
         webbrowser.open("https://youtube.com")
-        continue
+        return True
 
     if intent == "discord":
         print("Юко: Открываю Discord.")
-        launch_app("discord")
-        continue
+        commands.dispatch("launch_app", "discord")
+        return True
 
     if intent == "telegram":
         print("Юко: Открываю Telegram.")
-        launch_app("telegram")
-        continue
+        commands.dispatch("launch_app", "telegram")
+        return True
 
     if intent == "steam":
         print("Юко: Открываю Steam.")
-        launch_app("steam")
-        continue
+        commands.dispatch("launch_app", "steam")
+        return True
+
+    return False
+
+
+# ---------- главный цикл ----------
+
+def main():
+    global last_user_phrase, recorder, recent_files
+
+    parser = argparse.ArgumentParser(description="Юко — голосовой ассистент")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="показать, сколько времени заняла каждая фаза запуска",
+    )
+    parser.add_argument(
+        "--tune-asr",
+        action="store_true",
+        help="подобрать самый быстрый профиль Whisper для этой машины и выйти",
+    )
+    args = parser.parse_args()
+
+    if args.tune_asr:
+        from asr_profiles import tune
+        tune()
+        return
+
+    profile = StartupProfile(_T_START)
+    profile.mark("импорт модулей")
+
+    for d in (DATA_DIR, MODELS_DIR, TEMP_DIR):
+        d.mkdir(exist_ok=True)
+    ensure_packages()
+    profile.mark("проверка зависимостей")
+
+    # DNS + TLS до LLM — пока грузится Whisper, а не на первом вопросе
+    if llm.configured:
+        llm.prewarm()
+        llm.start_heartbeat()
+    else:
+        print("Юко: ключ GROQ_API_KEY не задан, работаю офлайн.")
+
+    # изменения words_config.py / apps.json / browsers.json подхватываются на лету
+    config_service.start()
+
+    # индекс файлов для search_file обновляется в фоне (yuko_data/file_index.sqlite3)
+    start_file_index()
+    start_classifier_loading()
+
+    # YUKO_RECENT_FILES=1 — живой список недавних файлов (inotify в Linux, иначе опрос);
+    # без него [RECENT_FILES]/[OPEN_RECENT] отвечает индекс файлов
+    recent_files = start_recent_files()
+
+    loader = start_model_loading()
+    open_audio()
+    profile.mark("открытие микрофона")
+
+    loader.join()
+    profile.mark(f"ожидание модели Whisper ({asr_profile['name']})")
+    profile.add("  загрузка модели (в фоне)", model_load_time)
+
+    print("Юко AI запущена. Скажи 'выход', чтобы завершить.\n")
+    if WAKE_MODE:
+        print("Юко: режим ожидания wake-слова включён.")
 
-    if intent == "app":
-        app_raw = extract_app_name(phrase)
-        if not app_raw:
-            print("Юко: Не поняла, какое приложение открыть.")
+    if RECORD_SESSION:
+        from session_recorder import SessionRecorder
+        minutes = float(os.environ.get("YUKO_RECORD_MINUTES", "10"))
+        recorder = SessionRecorder(minutes=minutes, audio_path=TEMP_DIR / "session_audio.i16")
+
+    partial_transcriber = None
+    if STREAMING_MODE and WAKE_MODE:
+        print("Юко: частичные расшифровки не работают вместе с режимом wake-слова.")
+    elif STREAMING_MODE:
+        from streaming_asr import PartialTranscriber
+        partial_transcriber = PartialTranscriber(capture, get_whisper_model, on_partial)
+        partial_transcriber.start()
+
+    if args.startup_profile:
+        print(profile.report())
+
+    prompts.start_console()
+
+    while True:
+        phrase = listen()
+        if not phrase:
             continue
-        app_name = normalize_app_name(app_raw)
-        print(f"Юко: Пытаюсь открыть {app_name}.")
-        launch_app(app_name)
-        continue
 
-    if intent == "ai":
-        clean_query = phrase
-        for w in WAKE_WORDS:
-            clean_query = clean_query.replace(w, " ")
-        clean_query = " ".join(clean_query.split())
+        phrase = phrase.strip().lower()
+        last_user_phrase = phrase
+
+        print("🎧 Распознано:", phrase)
+
+        # нечёткая правка — только чтобы узнать команду; вопрос для LLM, классификатор и слоты
+        # берут фразу как сказана (с явными CORRECTIONS): "сколько стоит интерьер" не станет "интернет"
+        command_phrase, fixes = phrases.corrector.correct(phrase)
+        if fixes:
+            print("✏️  Исправлено:", ", ".join(f"{a} → {b}" for a, b in fixes))
+        query_phrase = phrases.corrector.explicit(phrase)
+        last_user_phrase = query_phrase
+
+        intent = phrases.analyze(command_phrase)
+
+        if recorder and last_samples is not None:
+            recorder.record(last_samples, command_phrase, intent)
+
+        # команда в фоне ждёт уточнения: ответ (или «отмена») забираем, остальные фразы — как обычно
+        if intent != "exit" and prompts.answer(phrase):
+            continue
+
+        if intent == "exit":
+            print("Юко: Пока 👋")
+            prompts.cancel_all()
+            search_cancel.set()
+            commands.shutdown()
+            if recent_files is not None:
+                recent_files.stop()
+                print(recent_files.report())
+            print(commands.report())
+            print(speech_gate.report())
+            print(phrases.corrector.report())
+            if classifier:
+                print(classifier.report())
+            if adaptive_decoder:
+                print(adaptive_decoder.report())
+            if wake_detector:
+                print(wake_detector.report())
+            if partial_transcriber:
+                print(partial_transcriber.report())
+            if llm_stats:
+                print(llm_report())
+            print(llm.report())
+            print(remote.breaker.report())
+            llm.stop()
+            if memory is not None:
+                print(memory.report())
+            if hedger is not None:
+                print(hedger.report())
+            if response_cache is not None:
+                print(response_cache.report())
+                response_cache.save()
+            if recorder:
+                recorder.close()
+            break
+
+        if intent == "thanks":
+            print("Юко: Пожалуйста 💜")
+            continue
+
+        if run_local_intent(intent):
+            continue
+
+        if intent == "app":
+            app_raw = phrases.extract_app_name(command_phrase)
+            if not app_raw:
+                print("Юко: Не поняла, какое приложение открыть.")
+                continue
+            app_name = normalize_app_name(app_raw)
+            print(f"Юко: Пытаюсь открыть {app_name}.")
+            commands.dispatch("launch_app", app_name)
+            continue
+
+        if intent == "ai":
+            clean_query = phrases.strip_wake_words(query_phrase)
+
+            if classifier:
+                tag, slot, _ = classifier.predict(clean_query)
+                if tag in LOCAL_TAG_REPLIES:
+                    print("Юко:", LOCAL_TAG_REPLIES.get(tag, "Выполняю.").format(slot))
+                    execute_cmd(tag, slot, context_phrase=query_phrase)
+                    continue
+
+            on_cmd = lambda ct, p: execute_cmd(ct, p, context_phrase=query_phrase)
+            if hedger is not None:
+                if LLM_STREAM:
+                    remote_call = lambda call: ask_groq_stream(clean_query, on_cmd, call)
+                else:
+                    remote_call = lambda call: ask_groq(clean_query, call)
+                resp, source = hedger.ask(
+                    remote_call,
+                    lambda: offline_answer(clean_query),
+                    on_thinking=lambda: print("Юко: думаю…"),
+                )
+                if LLM_STREAM and source in ("remote", "late"):
+                    continue
+                if resp is None:
+                    resp = ask_offline(clean_query)
+            elif LLM_STREAM:
+                streamed = ask_groq_stream(clean_query, on_cmd)
+                if streamed is not None:
+                    continue
+                resp = ask_offline(clean_query)
+            else:
+                resp = ask_ai(clean_query)
+
+            text, cmds = parse_commands(resp)
 
-        resp = ask_ai(clean_query)
+            for ct, p in cmds:
+                execute_cmd(ct, p, context_phrase=query_phrase)
 
-        text, cmds = parse_commands(resp)
+            if text:
+                print("Юко:", text)
 
-        for ct, p in cmds:
-            execute_cmd(ct, p, context_phrase=phrase)
 
-        if text:
-            print("Юко:", text)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Политика доступа к путям для file_actions: разрешённые корни и запрещённые префиксы
+Корни разрешаются (resolve) один раз и складываются в дерево по компонентам пути,
+проверка пути — проход по его компонентам, без обращений к диску.
+Единственный resolve — самого проверяемого пути (он же снимает '..' и ссылки).
+
+    python path_policy.py   # самопроверка: '..', ссылки наружу, запрещённые папки
+"""
+
+import os
+import sys
+from pathlib import Path
+
+_ALLOW = "\x00allow"
+_DENY = "\x00deny"
+
+
+def _key(part: str) -> str:
+    # Windows: регистр и слэши не важны
+    return os.path.normcase(part)
+
+
+class PathPolicy:
+    def __init__(self, allowed_roots, forbidden_prefixes):
+        self.source = (tuple(allowed_roots), tuple(forbidden_prefixes))
+        self._trie: dict = {}
+        for root in forbidden_prefixes:
+            self._insert(root, _DENY)
+        for root in allowed_roots:
+            self._insert(root, _ALLOW)
+
+    def _insert(self, root, mark: str):
+        node = self._trie
+        for part in Path(root).expanduser().resolve().parts:
+            node = node.setdefault(_key(part), {})
+        node[mark] = True
+
+    def check_resolved(self, path) -> bool:
+        """Путь уже абсолютный и без '..'/ссылок (после resolve() или из os.scandir под корнем)"""
+        node = self._trie
+        allowed = False
+        for part in Path(path).parts:
+            node = node.get(_key(part))
+            if node is None:
+                break
+            # запрещённый префикс важнее разрешённого корня, на какой бы глубине ни был
+            if _DENY in node:
+                return False
+            if _ALLOW in node:
+                allowed = True
+        return allowed
+
+    def is_allowed(self, path) -> bool:
+        return self.check_resolved(Path(path).expanduser().resolve())
+
+    def filter(self, paths) -> list[Path]:
+        return [p for p in map(Path, paths) if self.is_allowed(p)]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        docs = base / "Documents"
+        secret = base / "AppData"
+        (docs / "inner").mkdir(parents=True)
+        (docs / "Private").mkdir()
+        secret.mkdir()
+        (docs / "a.txt").touch()
+        (secret / "token.txt").touch()
+
+        policy = PathPolicy([docs], [secret, docs / "Private"])
+        cases = [
+            (docs / "a.txt", True),
+            (docs / "inner" / ".." / "a.txt", True),
+            (docs / ".." / "AppData" / "token.txt", False),
+            (docs / "inner" / ".." / ".." / "AppData" / "token.txt", False),
+            (docs / "Private" / "x.txt", False),
+            (docs, True),
+            (base, False),
+            (base / "Documents2" / "a.txt", False),
+        ]
+        try:
+            (docs / "link_out").symlink_to(secret / "token.txt")
+            (docs / "dir_out").symlink_to(secret, target_is_directory=True)
+            (docs / "link_in").symlink_to(docs / "a.txt")
+            cases += [
+                (docs / "link_out", False),
+                (docs / "dir_out" / "token.txt", False),
+                (docs / "link_in", True),
+            ]
+        except OSError:
+            print("(ссылки создать нельзя — без прав администратора в Windows; эти случаи пропущены)")
+
+        ok = True
+        for path, expected in cases:
+            got = policy.is_allowed(path)
+            ok &= got == expected
+            print(f"{'✅' if got == expected else '❌'} {str(path.relative_to(base)):<40} -> {got}")
+        print("Всё верно." if ok else "Есть ошибки!")
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,96 @@
+"""
+Разбор распознанной фразы: интент, имя приложения, wake-слова
+Без побочных эффектов (ни LLM, ни конфигов на диске, ни вывода) — импортируют и main.py,
+и batch_transcribe.py в каждом процессе-воркере.
+
+    python phrase_analysis.py "юко открой дискорд"
+"""
+
+import sys
+
+from corrections import Corrector
+from keyword_engine import build_from_config, strip_spans
+
+
+class PhraseAnalyzer:
+    """Все словари words_config в одном автомате + корректор; при смене конфига собирается новый целиком"""
+
+    def __init__(self, cfg):
+        # фраза сканируется автоматом один раз на все категории
+        self.keywords = build_from_config(cfg)
+        # CORRECTIONS + нечёткая подгонка слов к словарю Юко между listen() и analyze()
+        self.corrector = Corrector(cfg)
+
+    def analyze(self, text: str) -> str:
+        found = self.keywords.categories(text)
+
+        def has(key):
+            return f"intent:{key}" in found
+
+        if has("exit"):
+            return "exit"
+        if has("thanks"):
+            return "thanks"
+
+        if "launch" in found:
+            if has("calc"):
+                return "calc"
+            if has("notepad"):
+                return "notepad"
+            if has("browser"):
+                return "browser"
+            if has("youtube"):
+                return "youtube"
+            if has("discord"):
+                return "discord"
+            if has("telegram"):
+                return "telegram"
+            if has("steam"):
+                return "steam"
+            # общее приложение
+            return "app"
+
+        return "ai"
+
+    def extract_app_name(self, text: str) -> str | None:
+        """
+        Пытается вытащить имя приложения из фразы:
+          'юко открой дискорд' -> 'дискорд'
+          'запусти steam'      -> 'steam'
+        """
+        matches = self.keywords.find(text)
+        launches = [m for m in matches if m.category == "launch"]
+        if not launches:
+            return None
+        # приоритет глаголов — как в LAUNCH_WORDS, дальше — первое вхождение
+        trigger = min(launches, key=lambda m: (m.value, m.start))
+        junk = [m for m in matches if m.category == "junk" and m.start >= trigger.end]
+        t = text.lower()
+        part = strip_spans(
+            t[trigger.end:],
+            [m._replace(start=m.start - trigger.end, end=m.end - trigger.end) for m in junk],
+        )
+        return part or None
+
+    def strip_wake_words(self, phrase: str) -> str:
+        return strip_spans(phrase, [m for m in self.keywords.find(phrase) if m.category == "wake"])
+
+    def has_wake_word(self, text: str) -> bool:
+        return "wake" in self.keywords.categories(text)
+
+    def has_browser_trigger(self, text: str) -> bool:
+        return "browser_trigger" in self.keywords.categories(text)
+
+
+if __name__ == "__main__":
+    import words_config
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    phrases = PhraseAnalyzer(words_config)
+    for phrase in sys.argv[1:] or ["юко открой дискорд", "запусти калькулятор", "юко что такое python"]:
+        fixed, _ = phrases.corrector.correct(phrase)
+        intent = phrases.analyze(fixed)
+        app = phrases.extract_app_name(fixed) if intent == "app" else None
+        print(f"{phrase!r} -> {intent}" + (f" ({app})" if app else ""))
@@ -0,0 +1,442 @@
+"""
+Недавние файлы: "открой последний скачанный файл" без обхода диска
+Сервис следит за ALLOWED_ROOTS (inotify в Linux, иначе опрос по mtime папок) и держит в памяти
+ограниченный список недавно созданных/изменённых файлов по каждому корню.
+"Последние N в Загрузках" отвечается сразу из памяти.
+Сервис необязательный (YUKO_RECENT_FILES=1): без него те же ответы берутся из file_index по mtime,
+он и так обходит эти папки, а в Windows inotify нет и опрос был бы вторым обходом тех же деревьев.
+
+    python recent_files.py [корень] [N]   # следить 10 с и показать последние файлы
+"""
+
+import ctypes
+import heapq
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+MAX_DEPTH = 5
+PER_ROOT = 200
+POLL_INTERVAL = 5.0
+# папка, в которой что-то появилось, ещё столько опросов считается "живой": её файлы
+# перепроверяются по одному (правка на месте mtime папки не меняет)
+ACTIVE_POLLS = 12
+
+# недокачанные и временные файлы в "последние" не попадают
+TEMP_SUFFIXES = (".crdownload", ".part", ".partial", ".tmp", ".download", ".opdownload")
+TEMP_PREFIXES = ("~$", ".~")
+
+# как пользователь (или LLM) называет корень -> имя папки
+ROOT_ALIASES = {
+    "downloads": "downloads", "загрузки": "downloads", "скачанные": "downloads", "скачанный": "downloads",
+    "desktop": "desktop", "рабочий стол": "desktop", "рабочем столе": "desktop",
+    "documents": "documents", "документы": "documents", "документах": "documents",
+    "pictures": "pictures", "картинки": "pictures", "фото": "pictures", "изображения": "pictures",
+    "videos": "videos", "видео": "videos",
+}
+
+
+def is_temp(name: str) -> bool:
+    low = name.lower()
+    return low.endswith(TEMP_SUFFIXES) or low.startswith(TEMP_PREFIXES)
+
+
+def root_key(name: str) -> str:
+    """Имя корня, как его назвали ("Загрузки", "downloads"), -> имя папки в нижнем регистре"""
+    name = name.strip().lower()
+    return ROOT_ALIASES.get(name, name)
+
+
+class RecentFiles:
+    """Ограниченные списки недавних файлов по корням; потокобезопасно"""
+
+    def __init__(self, roots, check_resolved=None, per_root: int = PER_ROOT):
+        self.roots = {Path(r).expanduser().resolve(): Path(r).name.lower() for r in roots}
+        self.check_resolved = check_resolved
+        self.per_root = per_root
+        # имя корня -> путь -> mtime; порядок = от старых событий к новым
+        self._lists: dict[str, OrderedDict[str, float]] = {name: OrderedDict() for name in self.roots.values()}
+        self._lock = threading.Lock()
+        self.events = 0
+
+    def root_of(self, path: str) -> str | None:
+        for root, name in self.roots.items():
+            if path.startswith(str(root) + os.sep):
+                return name
+        return None
+
+    def touch(self, path: str, mtime: float | None = None):
+        name = os.path.basename(path)
+        if is_temp(name):
+            return
+        root = self.root_of(path)
+        if root is None:
+            return
+        if self.check_resolved is not None and not self.check_resolved(path):
+            return
+        if mtime is None:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return
+        with self._lock:
+            lst = self._lists[root]
+            lst.pop(path, None)
+            lst[path] = mtime
+            while len(lst) > self.per_root:
+                lst.popitem(last=False)
+            self.events += 1
+
+    def tracked(self) -> list[tuple[str, float]]:
+        """Все файлы из списков — (путь, mtime), для перепроверки правок на месте"""
+        with self._lock:
+            return [(path, mtime) for lst in self._lists.values() for path, mtime in lst.items()]
+
+    def forget(self, path: str):
+        root = self.root_of(path)
+        if root is None:
+            return
+        with self._lock:
+            self._lists[root].pop(path, None)
+
+    def forget_dir(self, path: str):
+        prefix = path + os.sep
+        with self._lock:
+            for lst in self._lists.values():
+                for p in [p for p in lst if p.startswith(prefix)]:
+                    del lst[p]
+
+    def latest(self, root: str | None = None, n: int = 5, ext: str | None = None) -> list[Path]:
+        """Последние n файлов (по mtime) в корне ("downloads", "загрузки", ...) или во всех"""
+        if root:
+            key = root_key(root)
+            names = [key] if key in self._lists else []
+        else:
+            names = list(self._lists)
+        ext = ext.lower().lstrip(".") if ext else None
+        with self._lock:
+            items = [
+                (mtime, path)
+                for name in names
+                for path, mtime in self._lists[name].items()
+                if ext is None or path.lower().endswith("." + ext)
+            ]
+        out = []
+        for _, path in heapq.nlargest(n * 2 + 5, items):
+            if os.path.isfile(path):
+                out.append(Path(path))
+                if len(out) >= n:
+                    break
+        return out
+
+    def seed(self, max_depth: int = MAX_DEPTH):
+        """Первичное заполнение: самые свежие файлы каждого корня одним проходом"""
+        for root, name in self.roots.items():
+            found = []
+            stack = [(str(root), 0)]
+            while stack:
+                d, depth = stack.pop()
+                try:
+                    with os.scandir(d) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if depth < max_depth:
+                                        stack.append((entry.path, depth + 1))
+                                elif entry.is_file(follow_symlinks=False) and not is_temp(entry.name):
+                                    found.append((entry.stat().st_mtime, entry.path))
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+            newest = sorted(heapq.nlargest(self.per_root, found))
+            with self._lock:
+                lst = self._lists[name]
+                for mtime, path in newest:
+                    if path not in lst and (self.check_resolved is None or self.check_resolved(path)):
+                        lst[path] = mtime
+
+    def report(self) -> str:
+        with self._lock:
+            sizes = ", ".join(f"{name} {len(lst)}" for name, lst in self._lists.items())
+        return f"Недавние файлы: событий {self.events}, в памяти: {sizes}"
+
+
+# ---------- inotify (Linux) ----------
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    def __init__(self, recent: RecentFiles, max_depth: int = MAX_DEPTH):
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.recent = recent
+        self.max_depth = max_depth
+        self._wd: dict[int, tuple[str, int]] = {}  # watch -> (папка, глубина)
+        self._stop = threading.Event()
+
+    def _watch_tree(self, top: str, depth: int, touch_files: bool = False):
+        """
+        touch_files — папка новая: файлы, созданные в ней до того, как встало наблюдение,
+        событий уже не дадут, поэтому после add_watch дочитываем их сами
+        """
+        stack = [(top, depth)]
+        while stack:
+            d, dep = stack.pop()
+            wd = self._add_watch(self._fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                continue  # нет прав или кончился лимит max_user_watches — живём без этой папки
+            self._wd[wd] = (d, dep)
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        try:
+                            if e.is_dir(follow_symlinks=False):
+                                if dep < self.max_depth:
+                                    stack.append((e.path, dep + 1))
+                            elif touch_files and e.is_file(follow_symlinks=False):
+                                self.recent.touch(e.path, e.stat().st_mtime)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+
+    def run(self):
+        for root in self.recent.roots:
+            if root.is_dir():
+                self._watch_tree(str(root), 0)
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._handle(data)
+        os.close(self._fd)
+
+    def _handle(self, data: bytes):
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            raw = data[pos + _EVENT.size: pos + _EVENT.size + length]
+            pos += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # события потеряны — пересобираем списки обходом
+                self.recent.seed()
+                continue
+            if mask & IN_IGNORED:
+                self._wd.pop(wd, None)
+                continue
+            parent = self._wd.get(wd)
+            if parent is None:
+                continue
+            d, depth = parent
+            name = os.fsdecode(raw.rstrip(b"\0"))
+            path = os.path.join(d, name) if name else d
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and depth < self.max_depth:
+                    self._watch_tree(path, depth + 1, touch_files=True)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.recent.forget_dir(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+                self.recent.touch(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.recent.forget(path)
+
+    def stop(self):
+        self._stop.set()
+
+
+# ---------- опрос (Windows, macOS или без inotify) ----------
+
+class PollingWatcher:
+    """
+    Раз в interval секунд: stat каждой папки, перечитываем только изменившиеся (как file_index).
+    Правку файла на месте mtime папки не выдаёт, поэтому ещё stat файлов из списков недавних
+    и файлов "живых" папок (где недавно что-то появлялось)
+    """
+
+    def __init__(self, recent: RecentFiles, interval: float = POLL_INTERVAL, max_depth: int = MAX_DEPTH):
+        self.recent = recent
+        self.interval = interval
+        self.max_depth = max_depth
+        self._dirs: dict[str, tuple[int, list[str], dict[str, float]]] = {}
+        self._active: dict[str, int] = {}  # папка -> сколько опросов ещё перепроверять её файлы
+        self._stop = threading.Event()
+
+    def _scan(self, first: bool):
+        seen = set()
+        for root in self.recent.roots:
+            stack = [(str(root), 0)]
+            while stack:
+                d, depth = stack.pop()
+                try:
+                    mtime = os.stat(d).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(d)
+                old = self._dirs.get(d)
+                if old is not None and old[0] == mtime:
+                    subdirs = old[1]
+                    if not first and d in self._active:
+                        self._restat(d, old[2])
+                else:
+                    subdirs, files = [], {}
+                    try:
+                        with os.scandir(d) as it:
+                            for e in it:
+                                try:
+                                    if e.is_dir(follow_symlinks=False):
+                                        subdirs.append(e.name)
+                                    elif e.is_file(follow_symlinks=False):
+                                        files[e.name] = e.stat().st_mtime
+                                except OSError:
+                                    continue
+                    except OSError:
+                        continue
+                    if not first:
+                        before = old[2] if old is not None else {}
+                        for name, m in files.items():
+                            if before.get(name) != m:
+                                self.recent.touch(os.path.join(d, name), m)
+                        for name in before.keys() - files.keys():
+                            self.recent.forget(os.path.join(d, name))
+                    self._dirs[d] = (mtime, subdirs, files)
+                    if not first:
+                        self._active[d] = ACTIVE_POLLS
+                if depth < self.max_depth:
+                    stack.extend((os.path.join(d, s), depth + 1) for s in subdirs)
+        for d in [d for d in self._dirs if d not in seen]:
+            del self._dirs[d]
+            self._active.pop(d, None)
+            self.recent.forget_dir(d)
+        if not first:
+            for d in list(self._active):
+                self._active[d] -= 1
+                if self._active[d] <= 0:
+                    del self._active[d]
+            self._restat_tracked()
+
+    def _restat(self, d: str, files: dict[str, float]):
+        for name, m in files.items():
+            path = os.path.join(d, name)
+            try:
+                now = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if now != m:
+                files[name] = now
+                self.recent.touch(path, now)
+
+    def _restat_tracked(self):
+        # список недавних ограничен (PER_ROOT на корень) — это сотни stat, а не обход дерева
+        for path, m in self.recent.tracked():
+            try:
+                now = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if now > m:
+                self.recent.touch(path, now)
+
+    def run(self):
+        self._scan(first=True)
+        while not self._stop.wait(self.interval):
+            self._scan(first=False)
+
+    def stop(self):
+        self._stop.set()
+
+
+class RecentFilesService:
+    def __init__(self, roots, check_resolved=None, per_root: int = PER_ROOT):
+        self.recent = RecentFiles(roots, check_resolved, per_root)
+        self.watcher = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self.recent.seed()
+        watcher = None
+        if sys.platform.startswith("linux"):
+            try:
+                watcher = InotifyWatcher(self.recent)
+            except OSError:
+                watcher = None
+        self.watcher = watcher or PollingWatcher(self.recent)
+        self.watcher.run()
+
+    def stop(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if isinstance(self.watcher, InotifyWatcher) else "опрос"
+
+    def latest(self, root: str | None = None, n: int = 5, ext: str | None = None) -> list[Path]:
+        return self.recent.latest(root, n, ext)
+
+    def report(self) -> str:
+        return f"{self.recent.report()} ({self.mode})"
+
+
+def start_recent_files() -> RecentFilesService | None:
+    """Сервис по ALLOWED_ROOTS, только при YUKO_RECENT_FILES=1; иначе None (ответы — из file_index)"""
+    if os.getenv("YUKO_RECENT_FILES", "").strip() not in ("1", "true", "yes"):
+        return None
+    from file_actions import ALLOWED_ROOTS, get_policy
+    per_root = int(os.getenv("YUKO_RECENT_FILES_PER_ROOT", str(PER_ROOT)))
+    service = RecentFilesService(ALLOWED_ROOTS, get_policy().check_resolved, per_root)
+    service.start()
+    return service
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    args = sys.argv[1:]
+    root = Path(args[0]) if args else Path.home() / "Downloads"
+    n = int(args[1]) if len(args) > 1 else 5
+    service = RecentFilesService([root])
+    service.start()
+    print(f"Слежу за {root} 10 с — создай или измени там файл…")
+    time.sleep(10)
+    t0 = time.perf_counter()
+    found = service.latest(n=n)
+    print(f"Последние {n} ({(time.perf_counter() - t0) * 1e6:.0f} мкс):")
+    for p in found:
+        print("   ", p)
+    print(service.report())
+    service.stop()
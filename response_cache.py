@@ -0,0 +1,199 @@
+"""
+Кэш ответов LLM: одинаковые вопросы ("привет", "что такое python") не гоняем в Groq заново
+LRU по размеру + срок жизни записи, хранится в yuko_data/response_cache.json и переживает перезапуск.
+Ключ — нормализованный вопрос + версия системного промпта + модель.
+Ответы с тегами ([OPEN_BROWSER] и т.п.) не кэшируются: действие должно решаться заново каждый раз.
+
+    python response_cache.py            # статистика и содержимое кэша
+    python response_cache.py --clear
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from keyword_engine import normalize
+
+CACHE_PATH = Path(__file__).parent / "yuko_data" / "response_cache.json"
+TAG_RE = re.compile(r"\[([A-Z_]+)(?::([^\]]*))?\]", re.IGNORECASE)
+# put() не пишет файл сам: запись откладывается на столько секунд и собирает все put() за это время
+SAVE_DELAY = 5.0
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Поменяли промпт — старые ответы автоматически перестают совпадать"""
+    return f"{zlib.crc32(system_prompt.encode('utf-8')):08x}"
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(re.findall(r"\w+", normalize(text)))
+
+
+class ResponseCache:
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = 500, ttl_s: float = 24 * 3600):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # ключ -> [ответ, время записи, вопрос]; порядок = от давно использованных к свежим
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # запись файла — по одной за раз
+        self._dirty = False
+        self._timer = None
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # ответы с тегами, которые мы намеренно не сохранили
+        self.hit_time = 0.0
+        self.miss_time = 0.0  # сколько ждали LLM на промахах
+
+        self._load()
+
+    @staticmethod
+    def make_key(query: str, version: str, model: str) -> str:
+        raw = f"{model}\0{version}\0{normalize_query(query)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def _load(self):
+        if not self.path.is_file():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print("Юко: кэш ответов повреждён, начинаю с пустого:", e)
+            return
+        now = time.time()
+        for key, entry in data.get("entries", []):
+            if now - entry[1] < self.ttl_s:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        """Сразу на диск (при выходе); в остальное время — через schedule_save()"""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                data = {"entries": list(self._entries.items())}
+                self._dirty = False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # своё имя временного файла: опоздавший ответ из другого потока не пишет в тот же .tmp
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, prefix=self.path.stem + ".",
+                suffix=".tmp", delete=False,
+            ) as f:
+                tmp = f.name
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            try:
+                os.replace(tmp, self.path)
+            except OSError:
+                os.unlink(tmp)
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def schedule_save(self, delay: float = SAVE_DELAY):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(delay, self._save_later)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_later(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.save()
+        except OSError as e:
+            print("Юко: не смогла сохранить кэш ответов:", e)
+
+    def get(self, query: str, version: str, model: str) -> str | None:
+        t0 = time.perf_counter()
+        key = self.make_key(query, version, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] >= self.ttl_s:
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.hit_time += time.perf_counter() - t0
+            return entry[0]
+
+    def put(self, query: str, version: str, model: str, answer: str, elapsed: float = 0.0) -> bool:
+        """elapsed — сколько шёл запрос к LLM (для статистики); False — ответ не сохранён"""
+        self.miss_time += elapsed
+        if not answer or TAG_RE.search(answer):
+            self.skipped += 1
+            return False
+        key = self.make_key(query, version, model)
+        with self._lock:
+            self._entries[key] = [answer, time.time(), normalize_query(query)]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+        self.schedule_save()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        hit_us = self.hit_time / self.hits * 1e6 if self.hits else 0.0
+        miss_ms = self.miss_time / self.misses * 1000 if self.misses else 0.0
+        return (
+            f"Кэш ответов: попаданий {self.hits}/{total} ({rate:.0%}), "
+            f"попадание ~{hit_us:.0f} мкс, запрос к LLM ~{miss_ms:.0f} мс, "
+            f"с тегами не сохранено {self.skipped}, записей {len(self)}"
+        )
+
+
+def load_cache(path: Path = CACHE_PATH) -> ResponseCache | None:
+    """YUKO_CACHE_SIZE (записей, 0 — выключить) и YUKO_CACHE_TTL_H (часов)"""
+    size = int(os.environ.get("YUKO_CACHE_SIZE", "500"))
+    if size <= 0:
+        return None
+    ttl_h = float(os.environ.get("YUKO_CACHE_TTL_H", "24"))
+    return ResponseCache(path, max_entries=size, ttl_s=ttl_h * 3600)
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    cache = ResponseCache()
+    if "--clear" in sys.argv:
+        cache.clear()
+        print("Кэш ответов очищен.")
+    else:
+        now = time.time()
+        for key, (answer, ts, query) in cache._entries.items():
+            print(f"{(now - ts) / 60:6.0f} мин  {query!r}: {answer[:60]!r}")
+        print(f"Записей: {len(cache)}, файл {cache.path}")
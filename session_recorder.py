@@ -0,0 +1,198 @@
+"""
+Запись фраз сессии для отладки распознавания
+Аудио (int16) пишется по кругу в memory-mapped файл фиксированного размера,
+а на каждую фразу в индекс добавляется строка: смещение, длина, текст, интент.
+
+    python session_recorder.py --list
+    python session_recorder.py --export 42 фраза.wav
+"""
+
+import json
+import queue
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent
+TEMP_DIR = BASE_DIR / "yuko_data" / "temp"
+AUDIO_PATH = TEMP_DIR / "session_audio.i16"
+INDEX_PATH = TEMP_DIR / "session_index.jsonl"
+
+SAMPLE_RATE = 16000
+
+
+class SessionRecorder:
+    """
+    record() только кладёт фразу в очередь и сразу возвращается;
+    запись в файл и индекс делает фоновый поток. Если очередь полна — фраза теряется
+    (счётчик dropped), но захват звука не ждёт никогда.
+    """
+
+    def __init__(
+        self,
+        minutes: float = 10.0,
+        audio_path: Path = AUDIO_PATH,
+        index_path: Path = INDEX_PATH,
+        queue_size: int = 32,
+    ):
+        self.capacity = int(minutes * 60 * SAMPLE_RATE)
+        self.audio_path = audio_path
+        self.index_path = index_path
+        self.audio_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._mm, created = _open_ring(self.audio_path, self.capacity)
+        if created:
+            # новое (обнулённое) кольцо: старые записи индекса указывали бы на тишину
+            self.index_path.write_text("", encoding="utf-8")
+            self.total, self.next_id = 0, 0
+        else:
+            self.total, self.next_id = _restore_position(self.index_path, self.capacity)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def record(self, samples: np.ndarray, transcript: str = "", intent: str = ""):
+        try:
+            self._queue.put_nowait((samples, transcript, intent, time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+        self._mm.flush()
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            samples, transcript, intent, ts = item
+            try:
+                self._write(samples, transcript, intent, ts)
+            except Exception as e:
+                print("Ошибка записи сессии:", e)
+
+    def _write(self, samples: np.ndarray, transcript: str, intent: str, ts: float):
+        pcm = np.clip(samples, -1.0, 1.0)
+        pcm = (pcm * 32767).astype(np.int16)[-self.capacity:]
+        n = len(pcm)
+
+        pos = self.total % self.capacity
+        first = min(n, self.capacity - pos)
+        self._mm[pos:pos + first] = pcm[:first]
+        if first < n:
+            self._mm[:n - first] = pcm[first:]
+
+        entry = {
+            "id": self.next_id,
+            "time": round(ts, 3),
+            "offset": self.total,  # абсолютная позиция; в файле — offset % capacity
+            "length": n,
+            "transcript": transcript,
+            "intent": intent,
+        }
+        self.total += n
+        self.next_id += 1
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _open_ring(path: Path, capacity: int) -> tuple[np.memmap, bool]:
+    """(кольцо, создано ли заново) — заново, если файла нет или поменялся YUKO_RECORD_MINUTES"""
+    created = not (path.is_file() and path.stat().st_size == capacity * 2)
+    mm = np.memmap(path, dtype=np.int16, mode="w+" if created else "r+", shape=(capacity,))
+    return mm, created
+
+
+def _restore_position(index_path: Path, capacity: int) -> tuple[int, int]:
+    """Продолжаем писать с места, где остановилась прошлая сессия; перезаписанное выкидываем из индекса"""
+    entries = load_index(index_path)
+    if not entries:
+        return 0, 0
+    last = entries[-1]
+    total = last["offset"] + last["length"]
+
+    alive = [e for e in entries if total - e["offset"] <= capacity]
+    if len(alive) < len(entries):
+        with open(index_path, "w", encoding="utf-8") as f:
+            for e in alive:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+    return total, last["id"] + 1
+
+
+def load_index(index_path: Path = INDEX_PATH) -> list[dict]:
+    if not index_path.is_file():
+        return []
+    entries = []
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return entries
+
+
+def read_utterance(
+    entry: dict,
+    audio_path: Path = AUDIO_PATH,
+    index_path: Path = INDEX_PATH,
+) -> np.ndarray | None:
+    """
+    Достаёт аудио фразы по записи индекса (int16).
+    None — если фразу уже перезаписали по кругу.
+    """
+    if not audio_path.is_file():
+        return None
+    capacity = audio_path.stat().st_size // 2
+    mm = np.memmap(audio_path, dtype=np.int16, mode="r", shape=(capacity,))
+
+    last_end = max((e["offset"] + e["length"] for e in load_index(index_path)), default=0)
+    if last_end - entry["offset"] > capacity:
+        return None
+
+    pos = entry["offset"] % capacity
+    n = entry["length"]
+    if pos + n <= capacity:
+        return np.array(mm[pos:pos + n])
+    return np.concatenate((mm[pos:], mm[: n - (capacity - pos)]))
+
+
+def export_wav(entry: dict, out_path: str) -> bool:
+    pcm = read_utterance(entry)
+    if pcm is None:
+        return False
+    with wave.open(out_path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return True
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    entries = {e["id"]: e for e in load_index()}
+    if len(sys.argv) >= 4 and sys.argv[1] == "--export":
+        entry = entries.get(int(sys.argv[2]))
+        if entry is None:
+            print("Нет такой фразы в индексе")
+        elif export_wav(entry, sys.argv[3]):
+            print(f"✅ Сохранила фразу {entry['id']} в {sys.argv[3]}")
+        else:
+            print("❌ Фраза уже перезаписана")
+    else:
+        for e in entries.values():
+            secs = e["length"] / SAMPLE_RATE
+            print(f"{e['id']:>5}  {secs:5.1f} с  [{e['intent']}]  {e['transcript']}")
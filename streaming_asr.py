@@ -0,0 +1,117 @@
+"""
+Частичные (промежуточные) расшифровки во время фразы
+Растущий буфер перерасшифровывается, а в зачёт идёт только префикс,
+на котором сошлись два последних прогона (local agreement)
+"""
+
+import threading
+import time
+
+SAMPLE_RATE = 16000
+
+
+def common_prefix(a: list[str], b: list[str]) -> list[str]:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return a[:n]
+
+
+class PartialTranscriber:
+    """
+    Фоновый поток: пока пользователь говорит, раз в interval секунд
+    расшифровывает текущий кусок речи из AudioCapture и отдаёт
+    устоявшийся префикс в on_partial(start, text).
+    Если on_partial вернул True — фраза обработана, дальше её не трогаем.
+    """
+
+    def __init__(
+        self,
+        capture,
+        get_model,
+        on_partial,
+        interval: float = 0.4,
+        min_audio_s: float = 0.6,
+        max_audio_s: float = 6.0,
+    ):
+        self.capture = capture
+        self.get_model = get_model
+        self.on_partial = on_partial
+        self.interval = interval
+        self.min_audio = int(min_audio_s * SAMPLE_RATE)
+        self.max_audio = int(max_audio_s * SAMPLE_RATE)
+
+        self._thread = None
+        self._stop = threading.Event()
+
+        self._start: int | None = None
+        self._prev: list[str] = []
+        self._committed: list[str] = []
+        self._done = False
+
+        self.decodes = 0
+        self.decode_time = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _decode(self, samples) -> list[str]:
+        t0 = time.perf_counter()
+        try:
+            segments, _ = self.get_model().transcribe(
+                samples,
+                language="ru",
+                beam_size=1,
+                without_timestamps=True,
+                condition_on_previous_text=False,
+                vad_filter=False,
+            )
+            text = " ".join(seg.text for seg in segments)
+        except Exception as e:
+            print("Ошибка частичного распознавания:", e)
+            text = ""
+        self.decodes += 1
+        self.decode_time += time.perf_counter() - t0
+        return text.lower().replace(",", " ").replace(".", " ").split()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            current = self.capture.current_speech()
+            if current is None:
+                self._start = None
+                continue
+
+            start, samples = current
+            if start != self._start:
+                self._start = start
+                self._prev = []
+                self._committed = []
+                self._done = False
+
+            if self._done or not (self.min_audio <= len(samples) <= self.max_audio):
+                continue
+
+            words = self._decode(samples)
+            agreed = common_prefix(self._prev, words)
+            self._prev = words
+
+            if len(agreed) > len(self._committed):
+                self._committed = agreed
+                if self.on_partial(start, " ".join(agreed)):
+                    self._done = True
+
+    def report(self) -> str:
+        avg = self.decode_time / self.decodes * 1000 if self.decodes else 0.0
+        return f"Partial: перерасшифровок {self.decodes}, в среднем {avg:.0f} мс"
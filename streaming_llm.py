@@ -0,0 +1,262 @@
+"""
+Потоковые ответы LLM: текст печатается по мере прихода токенов,
+а теги вида [OPEN_BROWSER_URL:...] выполняются сразу, как только пришла закрывающая ']'.
+
+    python streaming_llm.py --bench   # время до первого текста и до действия: поток против блокирующего запроса
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# то же, что CMD_PATTERN в main.py, но целиком для одного тега
+TAG_RE = re.compile(r"\[([A-Z_]+)(?::([^\]]*))?\]", re.IGNORECASE)
+_TAG_HEAD = re.compile(r"\[[A-Z_]*(?::[^\]]*)?", re.IGNORECASE)
+MAX_TAG_LEN = 512  # недописанный "тег" длиннее — уже просто текст
+
+
+class TagStreamParser:
+    """Инкрементальный разбор CMD_PATTERN: feed(кусок) -> (текст для вывода, [(команда, параметр)])"""
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, chunk: str) -> tuple[str, list[tuple[str, str]]]:
+        data = self._pending + chunk
+        self._pending = ""
+        out = []
+        cmds = []
+        i = 0
+        while i < len(data):
+            j = data.find("[", i)
+            if j < 0:
+                out.append(data[i:])
+                break
+            out.append(data[i:j])
+            m = TAG_RE.match(data, j)
+            if m:
+                cmds.append((m.group(1), m.group(2) or ""))
+                i = m.end()
+                continue
+            rest = data[j:]
+            # "[OPEN_BRO" или "[WEB_SEARCH:рецепт бл" — ждём продолжения
+            head = _TAG_HEAD.match(rest)
+            if head and head.end() == len(rest) and len(rest) < MAX_TAG_LEN:
+                self._pending = rest
+                break
+            out.append("[")
+            i = j + 1
+        return "".join(out), cmds
+
+    def flush(self) -> str:
+        """Конец ответа: недописанный тег отдаём как текст"""
+        rest, self._pending = self._pending, ""
+        return rest
+
+
+class StreamCancelled(Exception):
+    pass
+
+
+class StreamResult:
+    def __init__(self):
+        self.cancelled = False
+        self.text = ""          # ответ без тегов
+        self.raw = ""           # ответ как есть
+        self.actions: list[tuple[str, str]] = []
+        self.first_output = None  # секунды от запроса до первого напечатанного текста
+        self.first_action = None  # ... до первого выполненного тега
+        self.total = 0.0
+
+
+def stream_completion(client, on_text, on_cmd, begin=None, **request) -> StreamResult:
+    """
+    client.chat.completions.create(stream=True, **request), по дороге:
+    on_text(кусок текста) и on_cmd(команда, параметр) сразу после ']'.
+    begin() вызывается перед первым выводом; False — ответ уже не нужен, поток закрывается.
+    """
+    result = StreamResult()
+    parser = TagStreamParser()
+    t0 = time.perf_counter()
+    text_parts = []
+    raw_parts = []
+    state = {"begun": begin is None}
+
+    def emit(text, cmds):
+        if (text.strip() or cmds) and not state["begun"]:
+            if not begin():
+                raise StreamCancelled
+            state["begun"] = True
+        if text:
+            if result.first_output is None and text.strip():
+                result.first_output = time.perf_counter() - t0
+            text_parts.append(text)
+            on_text(text)
+        for ct, p in cmds:
+            if result.first_action is None:
+                result.first_action = time.perf_counter() - t0
+            result.actions.append((ct, p))
+            on_cmd(ct, p)
+
+    stream = client.chat.completions.create(stream=True, **request)
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            raw_parts.append(delta)
+            emit(*parser.feed(delta))
+        emit(parser.flush(), [])
+    except StreamCancelled:
+        result.cancelled = True
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+    result.raw = "".join(raw_parts)
+    result.text = " ".join("".join(text_parts).split())
+    result.total = time.perf_counter() - t0
+    return result
+
+
+# ---------- замер на локальном сервере-заглушке ----------
+
+BENCH_ANSWER = (
+    "Открываю ютуб. [OPEN_BROWSER_URL:https://www.youtube.com] "
+    "Там много интересного: музыка, обучающие ролики и обзоры. "
+    "Если захочешь что-то конкретное — просто скажи, и я найду."
+)
+
+
+def _split_tokens(text: str) -> list[str]:
+    # примерно как у настоящей модели: слово с пробелом — один токен, длинные теги — несколько
+    return re.findall(r"\S{1,6}|\s+", text)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """OpenAI-совместимый /chat/completions: отвечает BENCH_ANSWER по токену раз в token_delay"""
+
+    # keep-alive, как у настоящего API: поток отдаётся chunked, соединение остаётся открытым
+    protocol_version = "HTTP/1.1"
+    first_token_delay = 0.25
+    token_delay = 0.02
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, data: dict):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        # /models — им прогревают соединение
+        self._send_json({"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "yuko"}]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        tokens = _split_tokens(BENCH_ANSWER)
+        time.sleep(self.first_token_delay)
+
+        if not body.get("stream"):
+            time.sleep(self.token_delay * len(tokens))
+            self._send_json({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": BENCH_ANSWER}}],
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, tok in enumerate(tokens):
+                if i:
+                    time.sleep(self.token_delay)
+                event = {
+                    "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}],
+                }
+                self._send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self._send_chunk(b"data: [DONE]\n\n")
+            self._send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # клиент закрыл поток раньше (ответ отменён)
+            self.close_connection = True
+
+
+def start_stub_server(first_token_delay: float | None = None, token_delay: float | None = None) -> ThreadingHTTPServer:
+    """Сервер на свободном порту; задержки можно поменять, например, чтобы изобразить медленную сеть"""
+    handler = type("StubHandler", (_StubHandler,), {})
+    if first_token_delay is not None:
+        handler.first_token_delay = first_token_delay
+    if token_delay is not None:
+        handler.token_delay = token_delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench(runs: int = 5):
+    from groq import Groq
+
+    server = start_stub_server()
+    host, port = server.server_address
+    client = Groq(api_key="stub", base_url=f"http://{host}:{port}")
+    request = {"model": "stub", "messages": [{"role": "user", "content": "открой ютуб"}]}
+
+    blocking = []
+    streaming = []
+    for _ in range(runs):
+        # блокирующий путь: ждём весь ответ, потом ищем теги
+        t0 = time.perf_counter()
+        completion = client.chat.completions.create(**request)
+        answer = completion.choices[0].message.content
+        TAG_RE.findall(answer)
+        done = time.perf_counter() - t0
+        blocking.append((done, done, done))
+
+        res = stream_completion(client, lambda text: None, lambda ct, p: None, **request)
+        streaming.append((res.first_output, res.first_action, res.total))
+    server.shutdown()
+
+    def med(rows, k):
+        vals = sorted(r[k] for r in rows)
+        return vals[len(vals) // 2] * 1000
+
+    print(f"Сервер-заглушка: первый токен через {_StubHandler.first_token_delay * 1000:.0f} мс, "
+          f"далее {_StubHandler.token_delay * 1000:.0f} мс/токен, {len(_split_tokens(BENCH_ANSWER))} токенов")
+    print(f"{'':<14}{'первый текст':>14}{'действие':>12}{'весь ответ':>12}")
+    for name, rows in (("блокирующий", blocking), ("потоковый", streaming)):
+        print(f"{name:<14}{med(rows, 0):>11.0f} мс{med(rows, 1):>9.0f} мс{med(rows, 2):>9.0f} мс")
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    if "--bench" in sys.argv:
+        bench()
+    else:
+        parser = TagStreamParser()
+        for piece in ["Открываю [OPEN_BRO", "WSER_URL:https://", "youtube.com] готово [x"]:
+            print(repr(piece), "->", parser.feed(piece))
+        print("flush ->", repr(parser.flush()))
@@ -0,0 +1,124 @@
+"""
+Дешёвый энергетический VAD перед Whisper
+Энергия кадра + zero-crossing rate + адаптивный уровень шума
+"""
+
+import threading
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SIZE = SAMPLE_RATE * FRAME_MS // 1000
+
+
+def frame_features(samples: np.ndarray, frame_size: int = FRAME_SIZE):
+    """RMS и ZCR для каждого кадра (векторно, без циклов по кадрам)"""
+    n = len(samples) // frame_size
+    if n == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty
+
+    frames = samples[: n * frame_size].reshape(n, frame_size).astype(np.float32, copy=False)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_size - 1)
+    return rms, zcr
+
+
+class SpeechGate:
+    """
+    Пропускает к распознаванию только окна, где есть речь.
+    Уровень шума калибруется на старте и плавно подстраивается по тихим кадрам.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 3.0,
+        min_rms: float = 0.004,
+        max_zcr: float = 0.35,
+        min_speech_ms: int = 200,
+        calibration_ms: int = 1000,
+        adapt: float = 0.05,
+    ):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.adapt = adapt
+
+        self.noise_floor: float | None = None
+        self._calib_left = max(1, calibration_ms // FRAME_MS)
+        self._calib: list[np.ndarray] = []
+        self._lock = threading.Lock()
+
+        self.checked = 0
+        self.passed = 0
+        self.skipped = 0
+
+    # ---------- уровень шума ----------
+
+    def calibrate(self, samples: np.ndarray):
+        """Явная калибровка по записи тишины"""
+        rms, _ = frame_features(samples)
+        if len(rms):
+            with self._lock:
+                self.noise_floor = float(np.percentile(rms, 50))
+                self._calib_left = 0
+                self._calib = []
+
+    def _auto_calibrate(self, rms: np.ndarray):
+        self._calib.append(rms[: self._calib_left])
+        self._calib_left -= min(len(rms), self._calib_left)
+        if self._calib_left == 0:
+            collected = np.concatenate(self._calib)
+            self.noise_floor = float(np.percentile(collected, 50))
+            self._calib = []
+
+    @property
+    def threshold(self) -> float:
+        floor = self.noise_floor if self.noise_floor is not None else self.min_rms
+        return max(self.min_rms, floor * self.ratio)
+
+    # ---------- решения ----------
+
+    def frame_mask(self, samples: np.ndarray, update: bool = True) -> np.ndarray:
+        """Маска речевых кадров; update=True подстраивает уровень шума"""
+        rms, zcr = frame_features(samples)
+        if not len(rms):
+            return np.zeros(0, dtype=bool)
+
+        with self._lock:
+            if update and self._calib_left > 0:
+                self._auto_calibrate(rms)
+
+            thr = self.threshold
+            # шипение (высокий ZCR) пропускаем только если оно заметно громче порога
+            mask = (rms > thr) & ((zcr < self.max_zcr) | (rms > thr * 2))
+
+            if update and self.noise_floor is not None:
+                quiet = rms[~mask]
+                if len(quiet):
+                    level = float(np.median(quiet))
+                    self.noise_floor += self.adapt * (level - self.noise_floor)
+
+        return mask
+
+    def accept(self, samples: np.ndarray) -> bool:
+        """True, если в окне достаточно речи, чтобы отдавать его в Whisper"""
+        mask = self.frame_mask(samples, update=False)
+        ok = int(np.count_nonzero(mask)) >= self.min_speech_frames
+
+        self.checked += 1
+        if ok:
+            self.passed += 1
+        else:
+            self.skipped += 1
+        return ok
+
+    def report(self) -> str:
+        floor = f"{self.noise_floor:.4f}" if self.noise_floor is not None else "—"
+        return (
+            f"VAD: проверено {self.checked}, в Whisper {self.passed}, "
+            f"пропущено {self.skipped}, уровень шума {floor}"
+        )
@@ -0,0 +1,100 @@
+"""
+Дешёвый детектор wake-слова для режима "всегда слушаю"
+Маленькая модель Whisper (tiny) + жадное декодирование только начала фразы
+"""
+
+import re
+import time
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+SAMPLE_RATE = 16000
+
+
+def _edit_distance_le1(a: str, b: str) -> bool:
+    """Расстояние Левенштейна между словами не больше 1"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = 0
+    diff = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            diff += 1
+            if diff > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+            j += 1
+            continue
+        i += 1
+        j += 1
+    return diff + (len(b) - j) + (len(a) - i) <= 1
+
+
+class WakeWordDetector:
+    """
+    Крутится постоянно вместо большой модели.
+    Декодирует только первые head_s секунд фразы, жадно и с коротким лимитом токенов,
+    а подсказка (initial_prompt) из списка wake-слов тянет tiny-модель к нужным словам.
+    """
+
+    def __init__(
+        self,
+        wake_words: list[str],
+        model_size: str = "tiny",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        head_s: float = 2.0,
+    ):
+        self.wake_words = [w.lower() for w in wake_words]
+        self.prompt = ", ".join(self.wake_words)
+        self.head = int(head_s * SAMPLE_RATE)
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+
+        self.checks = 0
+        self.hits = 0
+        self.total_time = 0.0
+
+    def matches(self, text: str) -> bool:
+        words = re.findall(r"\w+", text.lower())
+        for word in words:
+            for wake in self.wake_words:
+                if _edit_distance_le1(word, wake):
+                    return True
+        return False
+
+    def detect(self, samples: np.ndarray) -> bool:
+        t0 = time.perf_counter()
+        try:
+            segments, _ = self.model.transcribe(
+                samples[: self.head],
+                language="ru",
+                beam_size=1,
+                best_of=1,
+                temperature=0.0,
+                without_timestamps=True,
+                condition_on_previous_text=False,
+                initial_prompt=self.prompt,
+                max_new_tokens=8,
+                vad_filter=False,
+            )
+            text = " ".join(seg.text for seg in segments)
+        except Exception as e:
+            print("Ошибка детектора wake-слова:", e)
+            text = ""
+
+        self.total_time += time.perf_counter() - t0
+        self.checks += 1
+        hit = self.matches(text)
+        if hit:
+            self.hits += 1
+        return hit
+
+    def report(self) -> str:
+        avg = self.total_time / self.checks * 1000 if self.checks else 0.0
+        return f"Wake: проверок {self.checks}, срабатываний {self.hits}, в среднем {avg:.0f} мс"